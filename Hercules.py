@@ -5,38 +5,186 @@
 free use and reuse as long as you state Puffinc as th original author """
 
 import pandas as pd
+import numpy as np
 import traceback as tb
 from itertools import combinations
-import re
 from tqdm import tqdm
 import math
+from functools import lru_cache
+import multiprocessing
+import os
+import sys
+import glob
+import argparse
+import ast
+import pickle
+import sqlite3
+import pathlib
+import numbers
+import hashlib
+import json
+import uuid
+import time
+import tracemalloc
+import cProfile
+import pstats
+import contextlib
+from concurrent.futures import ProcessPoolExecutor
+import io
+import base64
+import urllib.parse
+from html import escape as html_escape
+
+# plotly, phik and matplotlib take most of the startup time : they are imported by the functions using them,
+# when the sections needing them are computed (see SECTION_REGISTRY)
 
-import plotly.express as px
-import plotly.offline as pof
-import plotly.graph_objs as go
-from plotly.subplots import make_subplots
-
-import phik
-from phik.report import plot_correlation_matrix
-from phik import report
-
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    import pyarrow.feather as feather
+    import pyarrow.compute as pc
+    import pyarrow.csv as pcsv
+except ImportError:
+    pa = None
+    pq = None
+    pc = None
+    pcsv = None
+    feather = None
 
-def main():
-    """ Main data profiling part"""
-    df = import_csv_dataset("centrales-de-production-nucleaire-et-thermique-a-flamme-edf.csv",';')
-    #df = import_excel_dataset("test.xlsx")
 
-    profile_dataset(df,'Hercules_report.html')
+def _sample_argument(sample:str):
+    """ --sample : an amount of rows (int) or a fraction of them (float) """
+    return float(sample) if '.' in sample else int(sample)
 
 
-def import_csv_dataset(csv:str,separateur=";", encodage='utf-8'):
-    """ Import data for profiling"""
-    # possible encoding 'utf-8'
-    df = pd.read_csv(csv,
-                     sep=separateur,
-                     encoding=encodage,
-                     skiprows=None)
-    return df
+def main():
+    """ Main data profiling part : profiles the given files, directories (their csv, excel, parquet and feather files)
+    or glob patterns, a report per file and an index of the reports (see profile_files)
+    e.g. python Hercules.py data/*.csv --separator ";" --output-dir reports --jobs 4 --sections nulls keys """
+    parser = argparse.ArgumentParser(description='Hercules data profiling of csv, excel, parquet and feather files')
+    parser.add_argument('paths', nargs='+', help='files, directories or glob patterns')
+    parser.add_argument('--output-dir', default='Hercules_reports', help='html reports, index.html and summary.csv directory')
+    parser.add_argument('--separator', default=';', help='csv separator')
+    parser.add_argument('--encoding', default='utf-8', help='csv encoding')
+    parser.add_argument('--all-as-string', action='store_true', help='every csv column profiled as text')
+    parser.add_argument('--max-key-length', type=int, default=None,
+                        help='longest column combinations checked by the business keys search (3 by default, '
+                             'the incremental mode loads the whole file for it : it only searches the keys when this is given)')
+    parser.add_argument('--max-lhs-length', type=int, default=2, help='longest left hand sides of the functional dependencies')
+    parser.add_argument('--max-dependency-error', type=float, default=0.0,
+                        help='approximate functional dependencies kept up to this share of the rows to remove (0 : exact ones only)')
+    parser.add_argument('--sample', type=_sample_argument, help='rows (int) or fraction of the rows (float) the profilers run on')
+    parser.add_argument('--sections', nargs='+', choices=PROFILE_SECTIONS, help='report sections, all of them by default')
+    parser.add_argument('--jobs', type=int, default=None, help='files profiled at the same time (the cpu count by default)')
+    parser.add_argument('--workers', type=int, default=None, help='processes profiling the columns and keys of each file')
+    parser.add_argument('--mode', default='memory', choices=PROFILE_MODES,
+                        help='memory : every file loaded whole ; chunks : csv files read by chunks (bounded memory, no keys section) ; '
+                             'incremental : chunks with a profile cache, only what changed since the last run is profiled ; '
+                             'metadata : parquet files profiled from their metadata statistics')
+    parser.add_argument('--chunksize', type=int, default=100000, help='rows of the csv chunks (chunks and incremental modes)')
+    parser.add_argument('--approximate', action='store_true',
+                        help='distinct counts and top values estimated by sketches (chunks and incremental modes)')
+    arguments = parser.parse_args()
+
+    chunk_options = {'chunksize': arguments.chunksize, 'approximate': arguments.approximate}
+    if arguments.mode == 'incremental':
+        chunk_options['max_key_length'] = arguments.max_key_length
+
+    summary = profile_files(dataset_files(arguments.paths), arguments.output_dir, arguments.jobs,
+                            import_options={'separateur': arguments.separator, 'encodage': arguments.encoding,
+                                            'all_as_string': arguments.all_as_string},
+                            profile_options={'workers': arguments.workers, 'sample': arguments.sample,
+                                             'sections': arguments.sections,
+                                             'max_key_length': 3 if arguments.max_key_length is None else arguments.max_key_length,
+                                             'max_lhs_length': arguments.max_lhs_length,
+                                             'max_dependency_error': arguments.max_dependency_error},
+                            mode=arguments.mode, chunk_options=chunk_options)
+    failed = summary[summary['status'] != 'ok']
+    print(f"\n{len(summary) - len(failed)} / {len(summary)} files profiled, index : {os.path.join(arguments.output_dir, 'index.html')}")
+    if len(failed) > 0:
+        sys.exit(1)
+
+
+def import_csv_dataset(csv:str,separateur=";", encodage='utf-8', schema=None, all_as_string=False, infer_rows=10000, category_ratio=0.05):
+    """ Import data for profiling, with the multithreaded arrow csv reader when pyarrow is installed
+    schema : {column : 'int64', 'float64', 'string' or 'category'}, inferred on the first infer_rows rows when None
+    (see infer_csv_schema), a number column whose later rows don't fit its inferred type is read as text
+    all_as_string : every column read as text, the values as written in the file (no number parsing),
+    the empty fields and the null markers (NA, null, NaN...) are still nulls
+    text columns are arrow backed strings, low cardinality ones categories """
+    if schema is None:
+        schema = infer_csv_schema(csv, separateur, encodage, infer_rows, category_ratio, all_as_string)
+    # the number columns are read as text then cast (see _cast_csv_number_column) : the file is read once,
+    # even when the later rows of some columns don't fit their inferred type
+    number_columns = [column for column, column_type in schema.items() if column_type in ('int64', 'float64')]
+    if pa is None:
+        # possible encoding 'utf-8'
+        df = pd.read_csv(csv,
+                         sep=separateur,
+                         encoding=encodage,
+                         skiprows=None,
+                         dtype={column: ('category' if column_type == 'category' else str) for column, column_type in schema.items()})
+        for column in number_columns:
+            values = df[column]
+            if not values.str.match(r'[+-]?0[0-9]').any():
+                number_values = pd.to_numeric(values, errors='coerce')
+                if number_values.notna().sum() == values.notna().sum():
+                    df[column] = number_values
+        return df
+
+    table = pcsv.read_csv(csv,
+                          read_options=pcsv.ReadOptions(encoding=encodage),
+                          parse_options=pcsv.ParseOptions(delimiter=separateur),
+                          convert_options=pcsv.ConvertOptions(column_types={column: _ARROW_CSV_TYPES['string' if column in number_columns else column_type]
+                                                                            for column, column_type in schema.items()},
+                                                              strings_can_be_null=True))
+    for column in number_columns:
+        table = table.set_column(table.schema.get_field_index(column), column,
+                                 _cast_csv_number_column(table[column], schema[column], column))
+    return table.to_pandas(types_mapper=lambda arrow_type: pd.StringDtype('pyarrow') if arrow_type == pa.string() else None)
+
+
+def _cast_csv_number_column(values, column_type:str, column:str):
+    """ arrow text column cast to the number type inferred on the first rows, or kept as text :
+    when a value further down is a code written with leading zeros (01001), which the cast would turn into 1001,
+    or when a value doesn't fit (integers are tried as floats first) """
+    if pc.any(pc.match_substring_regex(values, r'^[+-]?0[0-9]')).as_py():
+        _log(f"{column} read as string : values with leading zeros", 2)
+        return values
+    for number_type in (['int64', 'float64'] if column_type == 'int64' else ['float64']):
+        try:
+            return pc.cast(values, _ARROW_CSV_TYPES[number_type])
+        except pa.ArrowInvalid as error:
+            _log(f"{column} not read as {number_type} : {error}", 2)
+    return values
+
+
+# arrow csv types of the schema column types (see infer_csv_schema)
+_ARROW_CSV_TYPES = {}
+if pa is not None:
+    _ARROW_CSV_TYPES = {'int64': pa.int64(), 'float64': pa.float64(), 'string': pa.string(), 'category': pa.dictionary(pa.int32(), pa.string())}
+
+
+def infer_csv_schema(csv:str, separateur=";", encodage='utf-8', nrows=10000, category_ratio=0.05, all_as_string=False):
+    """ column types of a csv, inferred on its first nrows rows read as text :
+    'int64' or 'float64' for the numbers, except for the codes written with leading zeros (01001) kept as text,
+    'category' for the text columns with less distinct values than category_ratio of their values, else 'string'
+    all_as_string : every column is 'string' """
+    first_rows = pd.read_csv(csv, sep=separateur, encoding=encodage, nrows=nrows, dtype=str)
+    schema = {}
+    for column in first_rows:
+        values = first_rows[column].dropna()
+        if all_as_string:
+            schema[column] = 'string'
+        elif len(values) > 0 and values.str.fullmatch(r'[+-]?[0-9]+').all():
+            schema[column] = 'string' if values.str.match(r'[+-]?0[0-9]').any() else 'int64'
+        elif len(values) > 0 and not values.str.match(r'[+-]?0[0-9]').any() and pd.to_numeric(values, errors='coerce').notna().all():
+            schema[column] = 'float64'
+        elif len(values) > 0 and values.nunique() <= category_ratio * len(values):
+            schema[column] = 'category'
+        else:
+            schema[column] = 'string'
+    return schema
 
 
 def import_excel_dataset(file_path:str, header_row=1, skip_first_rows=0):
@@ -47,22 +195,308 @@ def import_excel_dataset(file_path:str, header_row=1, skip_first_rows=0):
     return df
 
 
+def import_parquet_dataset(parquet:str, columns=None):
+    """ Import data for profiling from a parquet file, memory mapped
+    columns : the only columns read from the file (all of them when None) """
+    if pq is None:
+        raise ImportError("pyarrow is needed to read parquet files")
+    table = pq.read_table(parquet, columns=columns, memory_map=True)
+    return table.to_pandas()
+
+
+def import_feather_dataset(feather_file:str, columns=None):
+    """ Import data for profiling from a feather or arrow ipc file, memory mapped
+    (uncompressed files are not copied to be read)
+    columns : the only columns read from the file (all of them when None) """
+    if feather is None:
+        raise ImportError("pyarrow is needed to read feather / arrow files")
+    table = feather.read_table(feather_file, columns=columns, memory_map=True)
+    return table.to_pandas()
+
+
+def import_csv_sample(csv:str, sample:int, separateur=";", encodage='utf-8', chunksize=100000, random_state=None):
+    """ Import a uniform sample of sample rows of a csv too large to be loaded, read as a stream of chunks
+    the rows keep their position in the file as index """
+    if not isinstance(sample, int) or sample <= 0:
+        raise ValueError("a csv stream is sampled by an amount of rows, not a fraction : " + str(sample))
+    chunks = pd.read_csv(csv,
+                         sep=separateur,
+                         encoding=encodage,
+                         chunksize=chunksize)
+    return reservoir_sample(chunks, sample, random_state)
+
+
+def reservoir_sample(chunks, sample_size:int, random_state=None):
+    """ uniform sample of sample_size rows of a stream of dataframes (reservoir sampling) :
+    every row gets a random key and the sample_size smallest keys seen so far are kept
+    the rows are returned in the stream order """
+    rng = np.random.default_rng(random_state)
+    reservoir = None
+    rows_seen = 0
+    for chunk in chunks:
+        keys = rng.random(len(chunk))
+        positions = np.arange(rows_seen, rows_seen + len(chunk))
+        rows_seen = rows_seen + len(chunk)
+        if reservoir is not None:
+            chunk = pd.concat([reservoir[0], chunk])
+            keys = np.concatenate([reservoir[1], keys])
+            positions = np.concatenate([reservoir[2], positions])
+        if len(keys) > sample_size:
+            kept = np.argpartition(keys, sample_size - 1)[:sample_size]
+            chunk, keys, positions = chunk.iloc[kept], keys[kept], positions[kept]
+        reservoir = (chunk, keys, positions)
+
+    if reservoir is None:
+        return pd.DataFrame()
+    return reservoir[0].iloc[np.argsort(reservoir[2])]
+
+
+def _sample_size(sample, rows_amount:int):
+    """ amount of sampled rows : sample is either an amount of rows (int) or a fraction of the rows (float) """
+    if isinstance(sample, float) and 0 < sample <= 1:
+        return min(math.ceil(sample * rows_amount), rows_amount)
+    if isinstance(sample, int) and not isinstance(sample, bool) and sample > 0:
+        return min(sample, rows_amount)
+    raise ValueError("sample is an amount of rows or a fraction in ]0, 1] : " + str(sample))
+
+
+def sample_dataset(df:pd.DataFrame(), sample, sample_method='uniform', stratify_column=None, random_state=None, chunksize=100000):
+    """ sample of the rows of df, kept in the df order with their index :
+    'uniform' : simple random sample
+    'reservoir' : uniform sample of df read as a stream of chunksize rows chunks (see import_csv_sample for a csv)
+    'stratified' : the same fraction of every stratify_column value (nan included), at least one row by value """
+    sample_size = _sample_size(sample, len(df))
+    rng = np.random.default_rng(random_state)
+
+    if sample_method == 'uniform':
+        positions = rng.choice(len(df), size=sample_size, replace=False)
+    elif sample_method == 'reservoir':
+        chunks = (df.iloc[start:start + chunksize] for start in range(0, len(df), chunksize))
+        return reservoir_sample(chunks, sample_size, rng)
+    elif sample_method == 'stratified':
+        if stratify_column is None:
+            raise ValueError("a stratified sample needs a stratify_column")
+        fraction = sample_size / len(df) if len(df) else 0
+        positions = []
+        for stratum_positions in df.groupby(stratify_column, dropna=False, sort=False).indices.values():
+            stratum_size = min(max(1, round(fraction * len(stratum_positions))), len(stratum_positions))
+            positions.append(rng.choice(stratum_positions, size=stratum_size, replace=False))
+        positions = np.concatenate(positions) if positions else np.array([], dtype=np.int64)
+    else:
+        raise ValueError("unknown sample_method : " + str(sample_method))
+
+    return df.iloc[np.sort(positions)]
+
+
+def encode_column(column:pd.Series):
+    """ dictionary encoding of a column (see encode_dataset) """
+    codes, uniques = pd.factorize(column, use_na_sentinel=False)
+    return {'codes': codes,
+            'uniques': uniques,
+            'counts': np.bincount(codes, minlength=len(uniques))}
+
+
+def encode_dataset(df:pd.DataFrame()):
+    """ dictionary encodes every column once (pd.factorize) so the profilers share the hashing work :
+    {column : {'codes': integer code of each row,
+               'uniques': distinct values in order of first appearance (nan included),
+               'counts': amount of rows of each distinct value}} """
+    encoding = {}
+    for column in df:
+        encoding[column] = encode_column(df[column])
+    return encoding
+
+
+# the characters str.strip() removes (arrow's utf8_trim_whitespace only removes the unicode White_Space ones)
+_STRIPPED_CHARACTERS = '\t\n\x0b\x0c\r\x1c\x1d\x1e\x1f \x85\xa0\u1680\u2000\u2001\u2002\u2003\u2004\u2005\u2006\u2007\u2008\u2009\u200a\u2028\u2029\u202f\u205f\u3000'
+
+
+def strip_values(values:pd.Series):
+    """ leading and trailing whitespace removed from the text values, without casting anything :
+    nulls stay nulls and the other values (numbers, dates...) are returned as they are,
+    text is stripped natively by arrow (as an arrow backed string Series) when pyarrow is installed """
+    if isinstance(values.dtype, pd.StringDtype):
+        return values.str.strip()
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        # the categories are stripped, then merged when two of them only differed by their whitespace
+        categories = pd.Series(values.cat.categories)
+        stripped_categories = strip_values(categories)
+        if stripped_categories is categories:
+            return values
+        category_codes, trimmed_categories = pd.factorize(stripped_categories)
+        codes = values.cat.codes.to_numpy()
+        codes = np.where(codes >= 0, category_codes[codes], -1)
+        return pd.Series(pd.Categorical.from_codes(codes, categories=trimmed_categories, ordered=values.cat.ordered),
+                         index=values.index, name=values.name)
+    if values.dtype != object:
+        return values
+
+    inferred_type = pd.api.types.infer_dtype(values, skipna=True)
+    if inferred_type == 'string':
+        if pa is None:
+            return values.str.strip()
+        stripped = pc.utf8_trim(pa.array(values, type=pa.string(), from_pandas=True), characters=_STRIPPED_CHARACTERS)
+        return pd.Series(pd.arrays.ArrowStringArray(stripped), index=values.index, name=values.name)
+    if inferred_type.startswith('mixed'):
+        return values.map(lambda value: value.strip() if isinstance(value, str) else value)
+    return values
+
+
+def trim_column_encoding(column_encoding:dict):
+    """ trim() applied to the distinct values of a column encoding instead of the rows,
+    returns the uniques and counts (no row codes) of the trimmed column """
+    uniques = pd.Series(column_encoding['uniques'])
+    trimmed_values = strip_values(uniques)
+    if trimmed_values is uniques:
+        return {'uniques': column_encoding['uniques'], 'counts': column_encoding['counts']}
+    trimmed_codes, trimmed_uniques = pd.factorize(trimmed_values, use_na_sentinel=False)
+    return {'uniques': trimmed_uniques,
+            'counts': np.bincount(trimmed_codes, weights=column_encoding['counts'], minlength=len(trimmed_uniques)).astype(np.int64)}
+
+
+def trim_encoding(encoding:dict):
+    """ trim_column_encoding of every column of an encoding """
+    trimmed_encoding = {}
+    for column, column_encoding in encoding.items():
+        trimmed_encoding[column] = trim_column_encoding(column_encoding)
+    return trimmed_encoding
+
+
+def _profiled_values(df:pd.DataFrame(), column:str, encoding=None):
+    """ not null values of a column, only its distinct values when an encoding is given """
+    if encoding is None:
+        return df[column].dropna()
+    return _not_null_uniques(encoding[column])
+
+
+def _not_null_uniques(column_encoding:dict):
+    uniques = column_encoding['uniques']
+    return pd.Series(uniques[~pd.isna(uniques)])
+
+
+# regex profiling patterns : result column, no match example column, pattern (used with re.match)
+PROFILING_REGEXES = [
+    ('bool_regex', 'b_regex_no_match', r'^[0-1]|True|true|False|false*$'),
+    ('regex_a_verifier_date_dd/mm/yyyy_regex', 'date_regex_no_match', r'^[0-3]?[0-9]/[0-3]?[0-9]/(?:[0-9]{2})?[0-9]{2}$'),
+    ('int_no_space_regex', 'i_regex_no_match', r'^[0-9]*$'),
+    ('decimal_regex', 'd_regex_no_match', r'^[-,.0-9]*$'), #old deimal check rule '\d*(\.\d+)?$'
+    ('one_word_no_accent_regex', 'l_regex_no_match', r'^[a-zA-Z]*$'),
+    ('one_word_alphanum_regex', 'w_regex_no_match', r'^[A-Za-z0-9À-ÖØ-öø-ÿ]*$'), # À-ÖØ-öø-ÿ accepts accentuation but not including [ ] ^ \ × ÷
+    ('text_regex', 't_regex_no_match', r'^[A-Za-z0-9À-ÿ◘\/\.,;:!?()"%\-\s]*$'), #looks trivial but it's not : it catches very special caracters like €&²
+    ]
+
+# what python's \s matches on str (RE2's \s is ascii only)
+_PYTHON_WHITESPACES = '\t\n\x0b\x0c\r \x1c-\x1f\x85\xa0\u1680\u2000-\u200a\u2028\u2029\u202f\u205f\u3000'
+
+
+@lru_cache(maxsize=None)
+def _re2_pattern(regex_pattern:str):
+    """ translates a python pattern used with re.match into an RE2 pattern with the same matches
+    when searched (as arrow does), returns None if the pattern has no exact RE2 translation """
+    translated = ''
+    in_class = False
+    i = 0
+    while i < len(regex_pattern):
+        char = regex_pattern[i]
+        if char == '\\' and i + 1 < len(regex_pattern):
+            escaped = regex_pattern[i:i + 2]
+            if escaped == '\\s':
+                translated = translated + (_PYTHON_WHITESPACES if in_class else '[' + _PYTHON_WHITESPACES + ']')
+            elif escaped[1] in 'SwWdDbBZ' or escaped[1].isdigit():
+                # unicode classes, boundaries and backreferences differ between python and RE2
+                return None
+            else:
+                translated = translated + escaped
+            i = i + 2
+            continue
+        if in_class:
+            in_class = char != ']'
+        elif char == '[':
+            in_class = True
+        elif char == '$':
+            # python's $ also matches before a trailing newline
+            char = '\n?$'
+        translated = translated + char
+        i = i + 1
+
+    return '^(?:' + translated + ')'
+
+
+def _regex_text(values:pd.Series):
+    """ values as text, arrow backed when pyarrow is installed so regexes run natively """
+    if pa is not None and isinstance(values.dtype, pd.StringDtype) and values.dtype.storage == 'pyarrow':
+        return values
+    text = values.astype('str')
+    if pa is not None:
+        text = text.astype('string[pyarrow]')
+    return text
+
+
+def _regex_matches(text:pd.Series, regex_pattern:str):
+    """ boolean array of the text values matching regex_pattern (re.match semantics) """
+    if pa is not None and text.dtype == 'string':
+        arrow_pattern = _re2_pattern(regex_pattern)
+        if arrow_pattern is not None:
+            try:
+                return text.str.contains(arrow_pattern, regex=True).to_numpy(dtype=bool)
+            except pa.ArrowInvalid:
+                pass
+        text = text.astype(object)
+    return text.str.match(regex_pattern).to_numpy(dtype=bool)
+
+
+def _regex_scan(column:pd.Series, regex_patterns:dict, looking_for_match:bool):
+    """ scans the column values once, by growing blocks, and returns for each named regex pattern
+    the first value matching (looking_for_match) or not matching it, None if there is none
+    a pattern leaves the scan as soon as its example is found, the scan stops when all have one """
+    examples = dict.fromkeys(regex_patterns)
+    remaining = dict(regex_patterns)
+    start = 0
+    block_size = 1024
+    while remaining and start < len(column):
+        block = column.iloc[start:start + block_size]
+        text = _regex_text(block)
+        for name, regex_pattern in list(remaining.items()):
+            found = _regex_matches(text, regex_pattern) == looking_for_match
+            if found.any():
+                examples[name] = text.iloc[int(np.argmax(found))]
+                del remaining[name]
+        start = start + block_size
+        block_size = min(block_size * 4, 1048576)
+
+    return examples
+
+
+def regex_classifier(column:pd.Series, regex_patterns:dict):
+    """ checks for each named regex pattern if ALL the values of the column match it,
+    returns {name : (match boolean, example not matching or '[No no-match]')}
+    the column is scanned once for all the patterns and the scan stops at the first counter examples """
+    if len(column) == 0:
+        return {name: (True, '[Empty col]') for name in regex_patterns}
+
+    no_match_examples = _regex_scan(column, regex_patterns, looking_for_match=False)
+    result = {}
+    for name, no_match_example in no_match_examples.items():
+        if no_match_example is None:
+            result[name] = (True, '[No no-match]')
+        else:
+            result[name] = (False, no_match_example)
+
+    return result
+
+
 def regex_match_finder(column:pd.DataFrame(),regex_pattern:str):
     """ Returns a values matching a regex,
     note : used to check if AT LEAST ONE values match (e.g. has leading whitespace)
     and not to check that ALL the values match"""
 
-    match_example = '[No match]'
-    Regex = re.compile(regex_pattern)
-
     if len(column) == 0:
-        match_example = '[Empty col]'
-    else:   
-        for value in column:
-            result = Regex.match(str(value))
-            if result is not None :
-                match_example = value
-    
+        return '[Empty col]'
+
+    match_example = _regex_scan(column, {'match': regex_pattern}, looking_for_match=True)['match']
+    if match_example is None:
+        match_example = '[No match]'
+
     return match_example
 
 
@@ -70,189 +504,892 @@ def regex_checker(column:pd.DataFrame(),regex_pattern:str):
     """ checks if ALL the values of the column matches the regex_pattern,
     returns a boolean match/no match
     and if no match an example not matching the regex_pattern """
-    match = True
-    no_match_example = '[No no-match]'
-    Regex = re.compile(regex_pattern)
+    return regex_classifier(column, {'match': regex_pattern})['match']
 
-    if len(column) == 0:
-        no_match_example = '[Empty col]'
-    else:   
-        for value in column:
-            result = Regex.match(str(value))
-            if result is None:
-                match = False
-                no_match_example = value
 
-    return match,no_match_example
+def whitespace_analysis(column_name:str, values:pd.Series):
+    """ leading whitespace example of the not null values of a column """
+    has_leading_spaces_regex = regex_match_finder(values,r'^\s+')
+    # trailing whitespace check not working yet (^\s+$ only finds whitespace only values) : not computed
+    # has_trailing_spaces_regex = regex_match_finder(values,r'^\s+$')
+
+    column_whitespace_analysis = {'name': column_name,
+                                  'has_leading_spaces_regex_example':has_leading_spaces_regex,
+                                  'has_trailing_spaces_regex_example':"regex_not_working_yet"}
+                                  #'has_trailing_spaces_regex_example':has_trailing_spaces_regex}
+    return column_whitespace_analysis
 
 
-def whitespace_profiling(df:pd.DataFrame()):
+def whitespace_profiling(df:pd.DataFrame(), encoding=None):
+    """ leading whitespace examples, checked on the distinct values when an encoding is given """
     whitespace_regexes = []
     for column in df:
-        # drop np.nan et 'nan' post-typage à 'string'
-        values = df[column].dropna()
-        values = values[values != 'nan']
-
-        has_leading_spaces_regex = regex_match_finder(values,'^\s+')
-        has_trailing_spaces_regex = regex_match_finder(values,'^\s+$')
-
-        regex_analysis = {'name': column,
-                          'has_leading_spaces_regex_example':has_leading_spaces_regex,
-                          'has_trailing_spaces_regex_example':"regex_not_working_yet"}
-                          #'has_trailing_spaces_regex_example':has_trailing_spaces_regex}
-        whitespace_regexes.append(regex_analysis)
+        whitespace_regexes.append(whitespace_analysis(column, _profiled_values(df, column, encoding)))
     result = pd.DataFrame(whitespace_regexes)
 
     return result
 
 
-def regex_profiling(df: pd.DataFrame()):
+def regex_analysis(column_name:str, values:pd.Series):
+    """ regex patterns matched by all the not null values of a column, and their no match examples """
+    regex_patterns = {name: regex_pattern for name, _, regex_pattern in PROFILING_REGEXES}
+    classification = regex_classifier(values, regex_patterns)
+
+    column_regex_analysis = {'name': column_name}
+    for name, no_match_column, _ in PROFILING_REGEXES:
+        column_regex_analysis[name] = classification[name][0]
+        column_regex_analysis[no_match_column] = classification[name][1]
+    return column_regex_analysis
+
+
+def regex_profiling(df: pd.DataFrame(), encoding=None):
+    """ checks which regex patterns all the values match, on the distinct values when an encoding is given
+    (e.g. trim_encoding(encode_dataset(df)) for the trimmed values) """
     regexes = []
     for column in df:
-        # drop np.nan et 'nan' post-typage à 'string'
-        values = df[column].dropna()
-        values = values[values != 'nan']
-
-        bool_regex = regex_checker(values,'^[0-1]|True|true|False|false*$')
-        date_regex = regex_checker(values,'^[0-3]?[0-9]/[0-3]?[0-9]/(?:[0-9]{2})?[0-9]{2}$')
-        int_regex = regex_checker(values,'^[0-9]*$')
-        decimal_regex = regex_checker(values,'^[-,.0-9]*$') #old deimal check rule '\d*(\.\d+)?$'
-        one_word_no_accent_regex = regex_checker(values,'^[a-zA-Z]*$')
-        one_word_alphanum_regex = regex_checker(values,'^[A-Za-z0-9À-ÖØ-öø-ÿ]*$') # À-ÖØ-öø-ÿ accepts accentuation but not including [ ] ^ \ × ÷
-        text_regex = regex_checker(values,'^[A-Za-z0-9À-ÿ◘\/\.,;:!?()"%\-\s]*$') #looks trivial but it's not : it catches very special caracters like €&²
-
-        regex_analysis = {'name': column,
-                          'bool_regex':bool_regex[0],'b_regex_no_match':bool_regex[1],
-                          'regex_a_verifier_date_dd/mm/yyyy_regex':date_regex[0],'date_regex_no_match':date_regex[1],
-                          'int_no_space_regex':int_regex[0],'i_regex_no_match':int_regex[1],
-                          'decimal_regex':decimal_regex[0],'d_regex_no_match':decimal_regex[1],
-                          'one_word_no_accent_regex':one_word_no_accent_regex[0],'l_regex_no_match':one_word_no_accent_regex[1],
-                          'one_word_alphanum_regex':one_word_alphanum_regex[0],'w_regex_no_match':one_word_alphanum_regex[1],
-                          'text_regex':text_regex[0],'t_regex_no_match':text_regex[1]                      
-                          }
-        regexes.append(regex_analysis)
+        regexes.append(regex_analysis(column, _profiled_values(df, column, encoding)))
     result = pd.DataFrame(regexes)
     
     return result
 
 
-def business_key_profiling(df:pd.DataFrame(),max_key_len:int):
+# data (dataset, key codes...) shared with the worker processes : inherited without any copy when they are forked,
+# else sent once to each worker by _share_data
+_shared_data = None
+
+
+def _share_data(data):
+    global _shared_data
+    _shared_data = data
+
+
+def _worker_pool(data, workers:int):
+    """ process pool whose workers read data as _shared_data
+    (without fork, data is pickled to every worker : only for data every worker needs whole, such as the key codes) """
+    _share_data(data)
+    if 'fork' in multiprocessing.get_all_start_methods():
+        return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('fork'))
+    return ProcessPoolExecutor(max_workers=workers, initializer=_share_data, initargs=(data,))
+
+
+def _refine_partition(partition, codes, cardinality:int):
+    """ refines a stripped partition (rows, group ids) by the integer codes of one more column
+    rows which end up alone in their group can't be part of a duplicate anymore and are stripped """
+    rows, groups = partition
+    if len(rows) == 0:
+        return partition
+    group_ids = pd.factorize(groups * cardinality + codes[rows])[0]
+    group_sizes = np.bincount(group_ids)
+    kept = group_sizes[group_ids] > 1
+    renumbering = np.cumsum(group_sizes > 1) - 1
+    return rows[kept], renumbering[group_ids[kept]]
+
+
+def _key_codes(df:pd.DataFrame, columns:list, encoding=None):
+    """ integer codes and cardinality of the columns, as used to refine partitions
+    (the columns whose encoding has no row codes, as sent back by the profile_columns workers, are encoded again) """
+    if encoding is None:
+        encoding = {}
+    codes = {}
+    for column in columns:
+        column_encoding = encoding.get(column)
+        if column_encoding is None or 'codes' not in column_encoding:
+            column_encoding = encode_column(df[column])
+        codes[column] = (column_encoding['codes'].astype(np.int64, copy=False), len(column_encoding['uniques']))
+    return codes
+
+
+def _first_duplicated_rows(codes:dict, candidates:list, prefix_stack=None):
+    """ first duplicated row (-1 for a key) of each candidate key, given in combinations order
+    the partitions of the candidates prefixes are kept in prefix_stack
+    so consecutive candidates only refine the partition by their last column """
+    if prefix_stack is None:
+        prefix_stack = []
+    first_rows = []
+    for candidate in candidates:
+        depth = 0
+        while depth < min(len(prefix_stack), len(candidate) - 1) and prefix_stack[depth][0] == candidate[depth]:
+            depth = depth + 1
+        del prefix_stack[depth:]
+        if prefix_stack:
+            partition = prefix_stack[-1][1]
+        else:
+            rows_amount = len(codes[candidate[0]][0])
+            partition = (np.arange(rows_amount), np.zeros(rows_amount, dtype=np.int64))
+        for column in candidate[depth:-1]:
+            partition = _refine_partition(partition, *codes[column])
+            prefix_stack.append((column, partition))
+        duplicated_rows = _refine_partition(partition, *codes[candidate[-1]])[0]
+        first_rows.append(int(duplicated_rows[0]) if len(duplicated_rows) > 0 else -1)
+    return first_rows
 
-    all_columns = df.columns.values.tolist()
-    nullable_columns = df.columns[df.isna().any()].tolist()
-    print('\nNullable columns are : ' + str(nullable_columns))
 
-    keys = []
-    alternate_keys = []
-    potential_keys = []
-
-    #combinaisons de toutes les clefs de toutes les longueurs (clef composée de 1 à nombre_de_col composantes)
-    # jusqu'à max max_key_len qui est déjà trop de possibilités
-    for i in range(1, min(len(all_columns),max_key_len) + 1):
-        combs = combinations(all_columns, i)
-        for potential_key in combs : potential_keys.append(potential_key)
-
-    for potential_key in tqdm(potential_keys):
-        # check if the column or a subset of col is nullable 
-        # (if so it is not a key : all parts of a key are not-nullable by definition)
-        a_subkey_is_nullable = False
-        for nullable_column in nullable_columns:
-            if nullable_column in potential_key:
-                a_subkey_is_nullable = True
-                subkey = nullable_column
-
-        if a_subkey_is_nullable:
-            is_key = False
-            example = 'A subset or a column of the key is a nullable : ' + str(subkey)
+def _first_duplicated_rows_of_shared_candidates(candidates:list):
+    return _first_duplicated_rows(_shared_data, candidates)
+
+
+def _partition_key_evaluator(df:pd.DataFrame, codes:dict, executor=None, workers=1):
+    """ returns a function evaluating a batch of candidate keys (given in combinations order)
+    by stripped partitions refinement, split in consecutive slices across the executor workers if any """
+    prefix_stack = []
+
+    def evaluate(candidates):
+        if executor is None:
+            first_rows = _first_duplicated_rows(codes, candidates, prefix_stack)
         else:
-            #check if a subset is a key (auquel cas le set actuel est forcément key)
-            a_subkey_is_already_a_key = False
-            for alternate_key in alternate_keys:
-                if set(alternate_key).issubset(set(potential_key)):
-                    a_subkey_is_already_a_key = True
-                    subkey = alternate_key
-
-            if a_subkey_is_already_a_key:
-                is_key = False
-                alternate_keys.append(potential_key)
-                example = 'A subset is a key : ' + str(subkey)
+            # a few slices per worker : each slice only computes its first prefix partition from scratch
+            slice_size = math.ceil(len(candidates) / (workers * 4))
+            slices = [candidates[i:i + slice_size] for i in range(0, len(candidates), slice_size)]
+            first_rows = [row for slice_rows in executor.map(_first_duplicated_rows_of_shared_candidates, slices) for row in slice_rows]
+
+        examples = []
+        for candidate, row in zip(candidates, first_rows):
+            if row < 0:
+                examples.append(None)
             else:
-                keyed_df = df[list(potential_key)]
-                if len(keyed_df) == len(keyed_df.drop_duplicates()):
-                    is_key = True
-                    alternate_keys.append(potential_key)
-                    example = ''
+                # first duplicated line, as df.duplicated(keep=False) would have found it
+                example_line = str(df.index.values[row] + 1)
+                example_value = str(df.iloc[[row]][list(candidate)].values.tolist()[0])
+                examples.append('ligne ' + example_line + ' : ' + example_value)
+        return examples
+
+    return evaluate
+
+
+def _sample_then_verify_evaluator(evaluate_on_sample, evaluate_on_data):
+    """ returns a function evaluating a batch of candidate keys on a sample first :
+    a duplicate in the sample rules the candidate out (with the sample example),
+    the candidates unique in the sample, still in combinations order, are verified on the whole data """
+
+    def evaluate(candidates):
+        examples = evaluate_on_sample(candidates)
+        survivors = [candidate for candidate, example in zip(candidates, examples) if example is None]
+        verified = iter(evaluate_on_data(survivors) if survivors else [])
+        return [next(verified) if example is None else example for example in examples]
+
+    return evaluate
+
+
+def _key_lattice_search(all_columns:list, nullable_columns:list, max_key_len:int, evaluate_candidates, batch_size=10000):
+    """ level by level search of the keys over the columns lattice
+    evaluate_candidates(candidates) returns for each candidate None if it is a key, else a duplicate example
+    nullable candidates and supersets of keys are never evaluated """
+    nullable = set(nullable_columns)
+    max_level = min(len(all_columns), max_key_len)
+    candidates_amount = sum(math.comb(len(all_columns), i) for i in range(1, max_level + 1))
+
+    keys = []
+    with tqdm(total=candidates_amount, disable=VERBOSITY < 1) as progress:
+        keyed = set() # candidates of the previous level which are keys or supersets of a key
+        for level in range(1, max_level + 1):
+            level_keyed = set()
+            pending = [] # (position in keys, candidate) to be evaluated
+            for potential_key in combinations(all_columns, level):
+                nullable_parts = [column for column in potential_key if column in nullable]
+                if nullable_parts:
+                    key_analysis = {'key': str(list(potential_key)), 'is_key':False,
+                                    'Raison de non clef : doublon/subkey':'A subset or a column of the key is a nullable : ' + str(nullable_parts[-1])}
+                    keys.append(key_analysis)
+                    progress.update(1)
+                    continue
+
+                # if a subset is a key, one of the subsets one column shorter is keyed too (the last one in combinations order is reported)
+                subkey = None
+                for i in range(level if level > 1 else 0):
+                    subset = potential_key[:i] + potential_key[i + 1:]
+                    if subset in keyed:
+                        subkey = subset
+                        break
+
+                if subkey is not None:
+                    level_keyed.add(potential_key)
+                    key_analysis = {'key': str(list(potential_key)), 'is_key':False,
+                                    'Raison de non clef : doublon/subkey':'A subset is a key : ' + str(subkey)}
+                    keys.append(key_analysis)
+                    progress.update(1)
                 else:
-                    is_key = False
-                    duplicate_row = keyed_df[keyed_df.duplicated(keep=False)]
-                    example_line = str(duplicate_row.head(1).index.values.tolist()[0] + 1 )
-                    example_value = str(duplicate_row.head(1).values.tolist()[0])
-                    example = 'ligne ' + example_line + ' : ' + example_value
-
-        key_analysis = {'key': str(list(potential_key)), 'is_key':is_key, 'Raison de non clef : doublon/subkey':example }
-        keys.append(key_analysis)
+                    pending.append((len(keys), potential_key))
+                    keys.append(None)
+
+                if len(pending) >= batch_size:
+                    _store_evaluated_keys(keys, pending, evaluate_candidates, level_keyed, progress)
+                    pending = []
+            _store_evaluated_keys(keys, pending, evaluate_candidates, level_keyed, progress)
+            keyed = level_keyed
+
+    return keys
+
+
+def _store_evaluated_keys(keys:list, pending:list, evaluate_candidates, level_keyed:set, progress):
+    """ evaluates the pending candidates and stores their analysis at their place in keys """
+    if not pending:
+        return
+    examples = evaluate_candidates([potential_key for _, potential_key in pending])
+    for (position, potential_key), example in zip(pending, examples):
+        if example is None:
+            level_keyed.add(potential_key)
+        keys[position] = {'key': str(list(potential_key)), 'is_key':example is None,
+                          'Raison de non clef : doublon/subkey':'' if example is None else example}
+    progress.update(len(pending))
+
+
+def business_key_profiling(df:pd.DataFrame(),max_key_len:int, encoding=None, workers=None, sample=None, sample_encoding=None):
+    """ searches the keys (unique and not nullable column combinations) up to max_key_len columns,
+    level by level over the columns lattice : supersets of a key and nullable combinations are pruned
+    and the other candidates are checked by refining the stripped partitions of their prefix
+    workers : amount of processes evaluating the candidates of a level in parallel
+    sample : rows of df (see sample_dataset) on which the candidates are checked first,
+    only the candidates without duplicate in the sample are verified on the whole df """
+
+    all_columns = df.columns.values.tolist()
+    nullable_columns = df.columns[df.isna().any()].tolist()
+    _log('\nNullable columns are : ' + str(nullable_columns))
+
+    not_nullable_columns = [column for column in all_columns if column not in nullable_columns]
+    codes = _key_codes(df, not_nullable_columns, encoding)
+    if sample is not None:
+        sample_codes = _key_codes(sample, not_nullable_columns, None if sample_encoding is None else {column: sample_encoding[column] for column in not_nullable_columns})
+        evaluate_on_sample = _partition_key_evaluator(sample, sample_codes)
+
+    if workers is None or workers <= 1 or not codes:
+        evaluate_candidates = _partition_key_evaluator(df, codes)
+        if sample is not None:
+            evaluate_candidates = _sample_then_verify_evaluator(evaluate_on_sample, evaluate_candidates)
+        keys = _key_lattice_search(all_columns, nullable_columns, max_key_len, evaluate_candidates)
+    else:
+        with _worker_pool(codes, workers) as executor:
+            evaluate_candidates = _partition_key_evaluator(df, codes, executor, workers)
+            if sample is not None:
+                evaluate_candidates = _sample_then_verify_evaluator(evaluate_on_sample, evaluate_candidates)
+            keys = _key_lattice_search(all_columns, nullable_columns, max_key_len, evaluate_candidates)
+        _share_data(None)
     result = pd.DataFrame(keys)
 
     return result
 
 
-def null_profiling(df:pd.DataFrame()):
+def _dependency_error(partition, codes, cardinality:int):
+    """ g3 error of lhs -> rhs from the stripped partition of lhs and the integer codes of rhs :
+    amount of rows to remove for the dependency to hold (the rows out of the most frequent rhs value of their lhs group) """
+    rows, groups = partition
+    if len(rows) == 0:
+        return 0
+    pair_codes, pairs = pd.factorize(groups * cardinality + codes[rows])
+    largest = np.zeros(groups.max() + 1, dtype=np.int64)
+    np.maximum.at(largest, pairs // cardinality, np.bincount(pair_codes))
+    return int(len(rows) - largest.sum())
+
+
+def functional_dependency_profiling(df:pd.DataFrame(), max_lhs_length:int, max_error=0.0, encoding=None):
+    """ TANE like search of the minimal functional dependencies lhs -> rhs with up to max_lhs_length lhs columns (nulls are values),
+    level by level over the columns lattice : the stripped partition of a lhs is its prefix partition (previous level) refined by its last column
+    max_error : approximate dependencies are kept up to this g3 error (share of the rows to remove for the dependency to hold)
+    a lhs which is a key or determines every other column isn't extended, the dependencies of its supersets wouldn't be minimal """
+    all_columns = df.columns.values.tolist()
+    codes = _key_codes(df, all_columns, encoding)
+    rows_amount = len(df)
+    allowed_error = math.floor(max_error * rows_amount)
+
+    dependencies = []
+
+    def store_dependency(lhs, rhs, error):
+        dependencies.append({'lhs': str(list(lhs)), 'rhs': rhs, 'exact': error == 0,
+                             'error_%': round(error / rows_amount * 100, 2) if rows_amount else 0.0})
+
+    # level 0 : (nearly) constant columns are determined by the empty lhs
+    partitions = {(): (np.arange(rows_amount), np.zeros(rows_amount, dtype=np.int64))}
+    determined = {(): set()}
+    for rhs in all_columns:
+        error = _dependency_error(partitions[()], *codes[rhs])
+        if error <= allowed_error:
+            store_dependency((), rhs, error)
+            determined[()].add(rhs)
+
+    max_level = min(len(all_columns) - 1, max_lhs_length)
+    with tqdm(total=sum(math.comb(len(all_columns), i) for i in range(1, max_level + 1)), desc='functional dependencies', disable=VERBOSITY < 1) as progress:
+        for level in range(1, max_level + 1):
+            level_partitions = {}
+            level_determined = {}
+            for lhs in combinations(all_columns, level):
+                progress.update(1)
+                subsets = [lhs[:i] + lhs[i + 1:] for i in range(level)]
+                if any(subset not in partitions for subset in subsets):
+                    continue
+                # rhs determined by a subset already : lhs -> rhs wouldn't be minimal
+                lhs_determined = set().union(*(determined[subset] for subset in subsets))
+                partition = _refine_partition(partitions[lhs[:-1]], *codes[lhs[-1]])
+                for rhs in all_columns:
+                    if rhs in lhs or rhs in lhs_determined:
+                        continue
+                    error = _dependency_error(partition, *codes[rhs])
+                    if error <= allowed_error:
+                        store_dependency(lhs, rhs, error)
+                        lhs_determined.add(rhs)
+                if len(partition[0]) > 0 and len(lhs_determined) + level < len(all_columns):
+                    level_partitions[lhs] = partition
+                    level_determined[lhs] = lhs_determined
+            # only the previous level partitions are kept
+            partitions = level_partitions
+            determined = level_determined
+
+    return pd.DataFrame(dependencies, columns=['lhs', 'rhs', 'exact', 'error_%'])
+
+
+def null_analysis(column:pd.Series, column_encoding=None):
+    col_len = len(column)
+    if column_encoding is None:
+        null_amount = column.isnull().sum()
+    else:
+        null_amount = column_encoding['counts'][pd.isna(column_encoding['uniques'])].sum()
+    null_percentage = round((null_amount/col_len)*100,2)
+    return {'name': column.name, 'len':col_len, 'nulls': null_amount, 'null_%':null_percentage}
+
+
+def null_profiling(df:pd.DataFrame(), encoding=None):
     nulls = []
     for column in df:
-        col_len = len(df[column])
-        null_amount = df[column].isnull().sum()
-        null_percentage = round((null_amount/col_len)*100,2)
-        column_null_analysis = {'name': column, 'len':col_len, 'nulls': null_amount, 'null_%':null_percentage}
-        nulls.append(column_null_analysis)
+        nulls.append(null_analysis(df[column], None if encoding is None else encoding[column]))
     result = pd.DataFrame(nulls)
 
-    return result 
+    return result
 
 
-def values_profiling(df:pd.DataFrame()):
+def _wilson_interval(successes:int, sample_len:int, population_len:int, z=1.96):
+    """ Wilson score interval of a proportion observed on a sample drawn without replacement
+    (finite population correction : the interval is the observed proportion when the sample is the population) """
+    if sample_len == 0:
+        return np.nan, np.nan
+    proportion = successes / sample_len
+    if population_len > 1:
+        z = z * math.sqrt(max(population_len - sample_len, 0) / (population_len - 1))
+    denominator = 1 + z**2 / sample_len
+    centre = (proportion + z**2 / (2 * sample_len)) / denominator
+    half_width = z * math.sqrt(proportion * (1 - proportion) / sample_len + z**2 / (4 * sample_len**2)) / denominator
+    return max(centre - half_width, 0), min(centre + half_width, 1)
+
+
+def sampling_analysis(column_name:str, column_encoding:dict, population_len:int, z=1.96):
+    """ null % and distinct amount of a whole column estimated from the encoding of its sample :
+    Wilson score interval of the null %, GEE estimate of the distinct values, bounded by the distinct values
+    seen in the sample and by every value seen once in the sample being a new value for each population/sample rows """
+    counts = column_encoding['counts']
+    null_values = pd.isna(column_encoding['uniques'])
+    sample_len = int(counts.sum())
+    null_amount = int(counts[null_values].sum())
+    null_low, null_high = _wilson_interval(null_amount, sample_len, population_len, z)
+
+    not_null_counts = counts[~null_values]
+    distinct = len(not_null_counts)
+    singletons = int((not_null_counts == 1).sum())
+    scale = population_len / sample_len if sample_len else 1
+    distinct_high = min(round(scale * singletons) + distinct - singletons, population_len)
+    distinct_estimate = min(round(math.sqrt(scale) * singletons) + distinct - singletons, distinct_high)
+
+    return {'name': column_name, 'sample_len': sample_len, 'len': population_len,
+            'null_%': round(null_amount / sample_len * 100, 2) if sample_len else np.nan,
+            'null_%_low': round(null_low * 100, 2), 'null_%_high': round(null_high * 100, 2),
+            'distinct_in_sample': distinct, 'distinct_estimate': distinct_estimate,
+            'distinct_low': distinct, 'distinct_high': distinct_high}
+
+
+def sampling_profiling(encoding:dict, population_len:int):
+    """ sampling_analysis of every column of a sample encoding """
+    estimates = []
+    for column, column_encoding in encoding.items():
+        estimates.append(sampling_analysis(column, column_encoding, population_len))
+    return pd.DataFrame(estimates)
+
+
+def parquet_statistics(parquet:str, columns=None):
+    """ rows, nulls and min/max of the columns of a parquet file read from its row groups statistics,
+    without reading the data (nan when a row group has no statistics for the column) """
+    if pq is None:
+        raise ImportError("pyarrow is needed to read parquet files")
+    parquet_file = pq.ParquetFile(parquet, memory_map=True)
+    metadata = parquet_file.metadata
+    # columns of the null type have no statistics : all their rows are null
+    null_columns = {field.name for field in parquet_file.schema_arrow if pa.types.is_null(field.type)}
+    rows_amount = metadata.num_rows
+    positions = {metadata.schema.column(i).path: i for i in range(metadata.num_columns)}
+    if columns is None:
+        columns = list(positions)
+
+    statistics = []
+    for column in columns:
+        nulls, minimum, maximum = 0, None, None
+        nulls_known, min_max_known = True, True
+        for row_group in range(metadata.num_row_groups):
+            row_group_rows = metadata.row_group(row_group).num_rows
+            column_statistics = metadata.row_group(row_group).column(positions[column]).statistics
+            if column_statistics is None and column in null_columns:
+                nulls = nulls + row_group_rows
+                continue
+            if column_statistics is None or not column_statistics.has_null_count:
+                nulls_known = False
+            else:
+                nulls = nulls + column_statistics.null_count
+            if column_statistics is not None and column_statistics.has_min_max:
+                minimum = column_statistics.min if minimum is None else min(minimum, column_statistics.min)
+                maximum = column_statistics.max if maximum is None else max(maximum, column_statistics.max)
+            elif column_statistics is None or column_statistics.null_count != row_group_rows:
+                # a row group whose values are all null has no min/max, it doesn't change them
+                min_max_known = False
+        if not nulls_known:
+            nulls = np.nan
+        if not min_max_known or minimum is None:
+            minimum, maximum = np.nan, np.nan
+        null_percentage = round((nulls/rows_amount)*100,2) if rows_amount else np.nan
+        statistics.append({'name': column, 'len': rows_amount, 'nulls': nulls, 'null_%': null_percentage,
+                           'min': minimum, 'max': maximum})
+
+    return pd.DataFrame(statistics)
+
+
+def sql_connection(database:str):
+    """ read only connection to a local database file : duckdb for the .duckdb files (the duckdb package is needed), else sqlite """
+    if os.path.splitext(database)[1].lower() in ('.duckdb', '.ddb'):
+        try:
+            import duckdb
+        except ImportError:
+            raise ImportError("duckdb is needed to read .duckdb files")
+        return duckdb.connect(database, read_only=True)
+    return sqlite3.connect(pathlib.Path(database).resolve().as_uri() + '?mode=ro', uri=True)
+
+
+def _quote(identifier:str):
+    """ sql quoted identifier (table or column name) """
+    return '"' + identifier.replace('"', '""') + '"'
+
+
+def sql_columns(connection, table:str):
+    """ column names of a table (or view) """
+    return [description[0] for description in connection.execute('SELECT * FROM ' + _quote(table) + ' LIMIT 0').description]
+
+
+def sql_numeric_columns(connection, table:str, nrows=1000):
+    """ columns whose not null values are all numbers (and not all null) : the candidates found on the first nrows rows
+    are checked on the whole table with sqlite, whose columns can hold values of any type (AVG and SUM would count a text as 0),
+    a duckdb column has a single type """
+    cursor = connection.execute('SELECT * FROM ' + _quote(table) + ' LIMIT ' + str(int(nrows)))
+    columns = [description[0] for description in cursor.description]
+    rows = cursor.fetchall()
+    numeric_columns = []
+    for position, column in enumerate(columns):
+        values = [row[position] for row in rows if row[position] is not None]
+        if values and all(isinstance(value, numbers.Number) and not isinstance(value, bool) for value in values):
+            numeric_columns.append(column)
+    if numeric_columns and isinstance(connection, sqlite3.Connection):
+        not_numbers = connection.execute('SELECT ' + ', '.join("SUM(typeof({0}) NOT IN ('integer', 'real', 'null'))".format(_quote(column))
+                                                               for column in numeric_columns) + ' FROM ' + _quote(table)).fetchone()
+        numeric_columns = [column for column, not_number in zip(numeric_columns, not_numbers) if not not_number]
+    return numeric_columns
+
+
+def sql_null_profiling(connection, table:str):
+    """ null_profiling of a table, as one COUNT(*) - COUNT(column) query """
+    columns = sql_columns(connection, table)
+    counts = connection.execute('SELECT COUNT(*)' + ''.join(', COUNT(' + _quote(column) + ')' for column in columns)
+                                + ' FROM ' + _quote(table)).fetchone()
+    rows_amount = counts[0]
+    nulls = []
+    for column, not_null_amount in zip(columns, counts[1:]):
+        null_amount = rows_amount - not_null_amount
+        null_percentage = round((null_amount/rows_amount)*100,2) if rows_amount else np.nan
+        nulls.append({'name': column, 'len': rows_amount, 'nulls': null_amount, 'null_%': null_percentage})
+    return pd.DataFrame(nulls)
+
+
+def sql_values_profiling(connection, table:str, null_result=None):
+    """ values_profiling of a table : distinct amounts counted by the database (nulls count as a value, as in pandas),
+    and the first 10 distinct values as samples (in the database order)
+    null_result : sql_null_profiling of the table, queried when None """
+    if null_result is None:
+        null_result = sql_null_profiling(connection, table)
+    columns = null_result['name'].tolist()
+    distinct_amounts = connection.execute('SELECT ' + ', '.join('COUNT(DISTINCT ' + _quote(column) + ')' for column in columns)
+                                          + ' FROM ' + _quote(table)).fetchone()
+    values = []
+    for column, distinct_amount, null_amount in zip(columns, distinct_amounts, null_result['nulls']):
+        samples = [np.nan if row[0] is None else row[0] for row in
+                   connection.execute('SELECT DISTINCT ' + _quote(column) + ' FROM ' + _quote(table) + ' LIMIT 10').fetchall()]
+        values.append(_values_analysis(column, samples, distinct_amount + (1 if null_amount > 0 else 0)))
+    return pd.DataFrame(values)
+
+
+def _sql_quantile(connection, table:str, column:str, not_null_amount:int, quantile:float):
+    """ quantile of a column with linear interpolation (as pandas), from the two ordered values around it """
+    position = quantile * (not_null_amount - 1)
+    below = math.floor(position)
+    values = [row[0] for row in connection.execute('SELECT ' + _quote(column) + ' FROM ' + _quote(table) + ' WHERE ' + _quote(column)
+                                                      + ' IS NOT NULL ORDER BY ' + _quote(column) + ' LIMIT 2 OFFSET ' + str(below)).fetchall()]
+    if len(values) == 1:
+        return float(values[0])
+    return float(values[0]) + (float(values[1]) - float(values[0])) * (position - below)
+
+
+def sql_numeric_describe(connection, table:str, numeric_columns=None):
+    """ df.describe(include='number') of a table : count, mean, min and max in one query, the standard deviation
+    from the means in a second one, and the quartiles by ordered queries
+    numeric_columns : sql_numeric_columns when None """
+    if numeric_columns is None:
+        numeric_columns = sql_numeric_columns(connection, table)
+    describe = {}
+    if not numeric_columns:
+        return pd.DataFrame(describe, index=['count', 'mean', 'std', 'min', '25%', '50%', '75%', 'max'])
+
+    aggregates = connection.execute('SELECT ' + ', '.join('COUNT({0}), AVG({0}), MIN({0}), MAX({0})'.format(_quote(column)) for column in numeric_columns)
+                                    + ' FROM ' + _quote(table)).fetchone()
+    aggregates = [aggregates[i:i + 4] for i in range(0, len(aggregates), 4)]
+    means = [0.0 if mean is None else float(mean) for _, mean, _, _ in aggregates]
+    squares = connection.execute('SELECT ' + ', '.join('SUM(({0} - ?) * ({0} - ?))'.format(_quote(column)) for column in numeric_columns)
+                                 + ' FROM ' + _quote(table), [value for mean in means for value in (mean, mean)]).fetchone()
+    for column, (count, mean, minimum, maximum), sum_of_squares in zip(numeric_columns, aggregates, squares):
+        if count == 0:
+            describe[column] = [0.0] + [np.nan] * 7
+            continue
+        std = math.sqrt(float(sum_of_squares) / (count - 1)) if count > 1 else np.nan
+        quartiles = [_sql_quantile(connection, table, column, count, quantile) for quantile in (0.25, 0.5, 0.75)]
+        describe[column] = [float(count), float(mean), std, float(minimum)] + quartiles + [float(maximum)]
+    return pd.DataFrame(describe, index=['count', 'mean', 'std', 'min', '25%', '50%', '75%', 'max'])
+
+
+def sql_non_numeric_describe(connection, table:str, non_numeric_columns:list):
+    """ df.describe(exclude='number') (count, unique, top, freq) of the non_numeric_columns of a table """
+    describe = {}
+    for column in non_numeric_columns:
+        count, unique = connection.execute('SELECT COUNT({0}), COUNT(DISTINCT {0}) FROM {1}'.format(_quote(column), _quote(table))).fetchone()
+        top = connection.execute('SELECT {0}, COUNT(*) FROM {1} WHERE {0} IS NOT NULL GROUP BY {0} ORDER BY COUNT(*) DESC LIMIT 1'
+                                 .format(_quote(column), _quote(table))).fetchone()
+        describe[column] = [count, unique, np.nan, np.nan] if top is None else [count, unique, top[0], top[1]]
+    return pd.DataFrame(describe, index=['count', 'unique', 'top', 'freq'], dtype='object')
+
+
+def _sql_key_evaluator(connection, table:str):
+    """ returns a function evaluating a batch of candidate keys (see _key_lattice_search),
+    with a GROUP BY query per candidate which stops at its first duplicated values """
+    def evaluate(candidates):
+        examples = []
+        for candidate in candidates:
+            columns = ', '.join(_quote(column) for column in candidate)
+            duplicate = connection.execute('SELECT ' + columns + ', COUNT(*) FROM ' + _quote(table) + ' GROUP BY ' + columns
+                                           + ' HAVING COUNT(*) > 1 LIMIT 1').fetchone()
+            examples.append(None if duplicate is None else 'valeurs ' + str(list(duplicate[:-1])) + ' : ' + str(duplicate[-1]) + ' lignes')
+        return examples
+
+    return evaluate
+
+
+def sql_business_key_profiling(connection, table:str, max_key_len:int, null_result=None):
+    """ business_key_profiling of a table, the candidates being checked by the database
+    null_result : sql_null_profiling of the table (for the nullable columns), queried when None """
+    if null_result is None:
+        null_result = sql_null_profiling(connection, table)
+    all_columns = null_result['name'].tolist()
+    nullable_columns = null_result.loc[null_result['nulls'] > 0, 'name'].tolist()
+    _log('\nNullable columns are : ' + str(nullable_columns))
+    return pd.DataFrame(_key_lattice_search(all_columns, nullable_columns, max_key_len, _sql_key_evaluator(connection, table)))
+
+
+def values_profiling(df:pd.DataFrame(), encoding=None):
     values = []
     for column in df:
-        distinct_values = df[column].drop_duplicates().values.tolist()
-        if len(distinct_values) <= 2:
-            values_type = 'binary'
-            values_sample = distinct_values
-        elif len(distinct_values) <= 10:
-            values_type = 'ordinal'
-            values_sample = distinct_values
-        else :
-            values_type = 'continuous'
-            values_sample = distinct_values[:10]
-
-        values_analysis = {'name': column,'type': values_type ,'samples': values_sample}
-        values.append(values_analysis)
+        if encoding is None:
+            distinct_values = df[column].drop_duplicates().values.tolist()
+        else:
+            distinct_values = encoding[column]['uniques'].values.tolist()
+        values.append(_values_analysis(column, distinct_values))
     result = pd.DataFrame(values)
 
     return result
 
 
+def _values_analysis(column:str, distinct_values:list, distinct_amount=None):
+    """ binary / ordinal / continuous type and samples of a column from its distinct values
+    (or only the first ones of them when distinct_amount is given) """
+    if distinct_amount is None:
+        distinct_amount = len(distinct_values)
+    if distinct_amount <= 2:
+        values_type = 'binary'
+        values_sample = distinct_values
+    elif distinct_amount <= 10:
+        values_type = 'ordinal'
+        values_sample = distinct_values
+    else :
+        values_type = 'continuous'
+        values_sample = distinct_values[:10]
+
+    return {'name': column,'type': values_type ,'samples': values_sample}
+
+
+def non_numeric_describe(df:pd.DataFrame(), encoding=None):
+    """ df.describe(exclude='number') (count, unique, top, freq) computed from the encoding counts """
+    non_numeric_df = df.select_dtypes(exclude='number')
+    if len(non_numeric_df.columns) == 0:
+        # df.describe raises without any column to describe
+        return pd.DataFrame(index=['count', 'unique', 'top', 'freq'], dtype='object')
+    if encoding is None or len(non_numeric_df.select_dtypes(include=['datetime', 'timedelta', 'datetimetz']).columns) > 0:
+        return df.describe(exclude='number')
+
+    describe = {}
+    for column in non_numeric_df:
+        uniques = encoding[column]['uniques']
+        not_null = ~pd.isna(uniques)
+        # same ordering (and ties) as value_counts()
+        value_counts = pd.Series(encoding[column]['counts'][not_null], index=uniques[not_null]).sort_values(ascending=False)
+        if len(value_counts) == 0:
+            describe[column] = [0, 0, np.nan, np.nan]
+        else:
+            describe[column] = [value_counts.sum(), len(value_counts), value_counts.index[0], value_counts.iloc[0]]
+    result = pd.DataFrame(describe, index=['count', 'unique', 'top', 'freq'], dtype='object')
+
+    return result
+
+
 def trim(df:pd.DataFrame()):
-    """ removes all leading and trailing whitespace
-    !!! all datatypes are changed as string during the process"""
+    """ removes all leading and trailing whitespace of the text columns, one column at a time and in place (see strip_values) :
+    the other columns and the nulls are kept as they are """
     for col in df:
-        df[col] = df[col].values.astype('str')
-        df[col] = df[col].str.strip()
+        column = df[col]
+        trimmed_column = strip_values(column)
+        if trimmed_column is not column:
+            df[col] = trimmed_column
     return df
 
 
-def result_output(result:pd.DataFrame(),title:str):
-    """ prints the result, and prepare an html output"""
+# console output : 0 nothing but errors and warnings, 1 the sections results, 2 the intermediate results too
+VERBOSITY = 1
+
+
+def _log(message, level=1):
+    """ prints the message when VERBOSITY is at least level """
+    if VERBOSITY >= level:
+        print(message)
+
+
+# tables with more rows are stored as json in the report and rendered page by page by the browser
+REPORT_TABLE_MAX_ROWS = 500
+
+
+def result_output(result:pd.DataFrame(),title:str, max_html_rows=REPORT_TABLE_MAX_ROWS):
+    """ prints the result, and prepare an html output
+    result : DataFrame or its Styler, rendered as a json table (see json_table) beyond max_html_rows rows """
+    data = result.data if isinstance(result, pd.io.formats.style.Styler) else result
 
     #output console
-    print('\n' + title)
-    print(result)
+    _log('\n' + title)
+    _log(data)
 
     #html output preparation (generation of an html string)
-    html = result.to_html(classes = 'table table-dark table-responsive-sm table-sm table-hover', index=False, table_id='my_table')
+    if len(data) > max_html_rows:
+        html = json_table(data, getattr(result, 'table_styles', None))
+    else:
+        html = result.to_html(classes = 'table table-dark table-responsive-sm table-sm table-hover', index=False, table_id='my_table')
     html = '<BR>' + title + '<BR>' + html
 
     return html
 
 
+# browser side rendering of the json tables, same cell colors as the *_colorization functions
+_JSON_TABLE_SCRIPT = """<script type="text/javascript">
+window.herculesTable = window.herculesTable || function (tableId, table, pageSize) {
+    var colors = {'binary': '#CFF800', 'ordinal': '#00B0BA', 'continuous': '#FFEC59', 'true': '#4DD091', 'false': '#FF6F68'};
+    var container = document.getElementById(tableId);
+    var pages = Math.max(1, Math.ceil(table.data.length / pageSize));
+    var page = 0;
+    function render() {
+        var htmlTable = document.createElement('table');
+        var headerRow = htmlTable.createTHead().insertRow();
+        table.columns.forEach(function (column) {
+            var th = document.createElement('th');
+            th.textContent = column;
+            headerRow.appendChild(th);
+        });
+        var body = htmlTable.createTBody();
+        table.data.slice(page * pageSize, (page + 1) * pageSize).forEach(function (row) {
+            var tr = body.insertRow();
+            row.forEach(function (value) {
+                var td = tr.insertCell();
+                td.textContent = value === null ? '' : (typeof value === 'object' ? JSON.stringify(value) : String(value));
+                var color = colors[String(value).toLowerCase()];
+                if (color) { td.style.backgroundColor = color; }
+            });
+        });
+        var navigation = document.createElement('div');
+        [['<', page - 1], ['>', page + 1]].forEach(function (button) {
+            var element = document.createElement('button');
+            element.textContent = button[0];
+            element.disabled = button[1] < 0 || button[1] >= pages;
+            element.onclick = function () { page = button[1]; render(); };
+            navigation.appendChild(element);
+        });
+        navigation.appendChild(document.createTextNode(' page ' + (page + 1) + ' / ' + pages + ' (' + table.data.length + ' rows)'));
+        container.replaceChildren(htmlTable, navigation);
+    }
+    render();
+};
+</script>"""
+
+
+def json_table(result:pd.DataFrame, table_styles=None, page_size=100):
+    """ html of a table stored as json, rendered page_size rows at a time by the browser
+    table_styles : Styler table styles (see table_styles()) applied to the table """
+    table_id = 'json_table_' + uuid.uuid4().hex
+    css = ''
+    for style in table_styles or []:
+        properties = '; '.join(name + ': ' + str(value) for name, value in style['props'])
+        css = css + '#' + table_id + ' ' + style['selector'] + ' {' + properties + '}\n'
+    table = result.to_json(orient='split', index=False, default_handler=str, date_format='iso')
+    # a '</' inside the data would close the script element
+    table = table.replace('</', '<\\/')
+    html = '<style>' + css + '</style>' + _JSON_TABLE_SCRIPT
+    html = html + '<div id="' + table_id + '"></div>'
+    html = html + '<script type="text/javascript">window.herculesTable("' + table_id + '", ' + table + ', ' + str(page_size) + ');</script>'
+    return html
+
+
+class HtmlReport:
+    """ html report written to its file section by section, as soon as each one is computed
+    plotly.js is written once, before the first chart (see write_chart), the charts only hold their div
+    profiler : StageProfiler the writes are recorded in, as the 'html write' stage """
+
+    def __init__(self, output_html_file:str, profiler=None):
+        self.html_file = open(output_html_file, "w")
+        self.plotlyjs_written = False
+        self.profiler = profiler
+
+    def _write_stage(self):
+        return contextlib.nullcontext() if self.profiler is None else self.profiler.stage('html write')
+
+    def write(self, html:str):
+        with self._write_stage():
+            self.html_file.write(html)
+
+    def write_chart(self, html:str):
+        """ writes a chart rendered with include_plotlyjs=False ('' for no chart) """
+        if not html:
+            return
+        with self._write_stage():
+            if not self.plotlyjs_written:
+                import plotly.offline as pof
+                self.html_file.write('<script type="text/javascript">window.PlotlyConfig = {MathJaxConfig: \'local\'};</script>')
+                self.html_file.write('<script type="text/javascript">' + pof.get_plotlyjs() + '</script>')
+                self.plotlyjs_written = True
+            self.html_file.write(html)
+
+    def close(self):
+        self.html_file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def _peak_rss():
+    """ peak resident set size of the process in MB (linux only, None elsewhere) """
+    try:
+        with open('/proc/self/status') as status:
+            for line in status:
+                if line.startswith('VmHWM:'):
+                    return round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        pass
+    return None
+
+
+def _reset_peak_rss():
+    """ the peak resident set size starts again from the current one (linux only) """
+    try:
+        with open('/proc/self/clear_refs', 'w') as clear_refs:
+            clear_refs.write('5')
+    except OSError:
+        pass
+
+
+class StageProfiler:
+    """ wall time, cpu time, peak memory and throughput of each pipeline stage (see stage)
+    rows_amount : default amount of rows of the stages, for their rows per second
+    trace_memory : peak python allocations of each stage with tracemalloc (the traced stages run slower)
+    cprofile_stage : name of the stage run under cProfile, its statistics are saved to cprofile_file (pstats format)
+    or printed when there is no file """
+
+    def __init__(self, rows_amount=None, trace_memory=False, cprofile_stage=None, cprofile_file=None):
+        self.rows_amount = rows_amount
+        self.trace_memory = trace_memory
+        self.cprofile_stage = cprofile_stage
+        self.cprofile_file = cprofile_file
+        self.stages = {}
+        self.running = 0
+
+    @contextlib.contextmanager
+    def stage(self, name:str, rows_amount=None):
+        """ records the block as the stage name, the runs of a stage under the same name are added up
+        the memory is only measured for the outermost stages """
+        outermost = self.running == 0
+        self.running += 1
+        started_tracing = False
+        if outermost:
+            _reset_peak_rss()
+            if self.trace_memory:
+                started_tracing = not tracemalloc.is_tracing()
+                if started_tracing:
+                    tracemalloc.start()
+                tracemalloc.reset_peak()
+        profiler = cProfile.Profile() if name == self.cprofile_stage else None
+        wall_start, cpu_start = time.perf_counter(), time.process_time()
+        if profiler is not None:
+            profiler.enable()
+        try:
+            yield
+        finally:
+            if profiler is not None:
+                profiler.disable()
+            wall, cpu = time.perf_counter() - wall_start, time.process_time() - cpu_start
+            self.running -= 1
+            peak_memory = None
+            if outermost and self.trace_memory:
+                peak_memory = round(tracemalloc.get_traced_memory()[1] / 2**20, 1)
+                if started_tracing:
+                    tracemalloc.stop()
+            self.add(name, wall, cpu, rows_amount, peak_memory, _peak_rss() if outermost else None)
+            if profiler is not None:
+                self._cprofile_output(profiler)
+
+    def add(self, name:str, wall:float, cpu:float, rows_amount=None, peak_memory=None, peak_rss=None):
+        """ adds a run of wall and cpu seconds to the stage name """
+        record = self.stages.setdefault(name, {'stage': name, 'runs': 0, 'wall_s': 0.0, 'cpu_s': 0.0,
+                                               'rows': rows_amount if rows_amount is not None else self.rows_amount,
+                                               'peak_memory_mb': None, 'peak_rss_mb': None})
+        record['runs'] += 1
+        record['wall_s'] += wall
+        record['cpu_s'] += cpu
+        for key, value in (('peak_memory_mb', peak_memory), ('peak_rss_mb', peak_rss)):
+            if value is not None:
+                record[key] = value if record[key] is None else max(record[key], value)
+
+    def _cprofile_output(self, profiler):
+        if self.cprofile_file is not None:
+            profiler.dump_stats(self.cprofile_file)
+        else:
+            pstats.Stats(profiler).sort_stats('cumulative').print_stats(30)
+
+    def results(self):
+        """ one row per stage, in the order they first ran """
+        result = pd.DataFrame(list(self.stages.values()), columns=['stage', 'runs', 'wall_s', 'cpu_s', 'rows',
+                                                                   'peak_memory_mb', 'peak_rss_mb'])
+        result['rows_per_s'] = [round(rows / wall) if rows and wall > 0 else None for rows, wall in zip(result['rows'], result['wall_s'])]
+        result['wall_s'] = result['wall_s'].round(3)
+        result['cpu_s'] = result['cpu_s'].round(3)
+        return result
+
+    def to_json(self, json_file:str):
+        """ writes the stages results to json_file """
+        with open(json_file, 'w') as output:
+            json.dump({'stages': self.results().astype(object).where(lambda result: result.notna(), None).to_dict('records')},
+                      output, indent=2)
+
+
 # def init_html_results():
 #     """ creates a string concatenating the boostrap references"""
 #     css = '<link rel="stylesheet" href="https://cdn.jsdelivr.net/npm/bootstrap@4.3.1/dist/css/bootstrap.min.css" integrity="sha384-ggOyR0iXCbMQv3Xipma34MD+dH/1fQ784/j6cY/iJTQUOhcWr7x9JvoRxT2MZw1T" crossorigin="anonymous">'
@@ -265,17 +1402,111 @@ def result_output(result:pd.DataFrame(),title:str):
 #     return inited_html
 
 
-def correlation_analysis(df: pd.DataFrame()):
-    phik_overview = df.phik_matrix()
-    phik_overview.round(2)
-    print(phik_overview)
+def correlation_columns(df:pd.DataFrame, values_analysis_results:pd.DataFrame, encoding=None, max_categories=100):
+    """ columns worth a phi-k correlation according to the values profiling :
+    returns the columns, the interval (numeric continuous, binned) columns among them and the skipped columns with the reason
+    constant columns and non numeric columns with more than max_categories distinct values (near unique text) are skipped """
+    columns = []
+    interval_columns = []
+    skipped = {}
+    for column, column_type in zip(values_analysis_results['name'], values_analysis_results['type']):
+        if encoding is None:
+            distinct_amount = df[column].nunique()
+        else:
+            distinct_amount = len(_not_null_uniques(encoding[column]))
+        if distinct_amount < 2:
+            skipped[column] = 'constant'
+        elif column_type == 'continuous' and pd.api.types.is_numeric_dtype(df[column]):
+            columns.append(column)
+            interval_columns.append(column)
+        elif distinct_amount > max_categories:
+            skipped[column] = str(distinct_amount) + ' distinct values'
+        else:
+            columns.append(column)
+    return columns, interval_columns, skipped
+
+
+def _binned_codes(df:pd.DataFrame, columns:list, interval_columns:list, bins=10):
+    """ integer codes of the columns, the interval columns being binned once (phik bin_data) :
+    {column : (codes, cardinality)}, the nulls and the underflow / overflow bins are coded -1 (phik drops them) """
+    from phik.binning import bin_data
+    from phik import definitions as phik_definitions
+    binned = bin_data(df[columns], cols=interval_columns, bins=bins)
+    codes = {}
+    for column in columns:
+        column_codes, uniques = pd.factorize(binned[column])
+        dropped = pd.Index(uniques, dtype='object').isin([phik_definitions.UF, phik_definitions.OF])
+        renumbering = np.where(dropped, -1, np.cumsum(~dropped) - 1)
+        codes[column] = (np.where(column_codes >= 0, renumbering[column_codes], -1), int((~dropped).sum()))
+    return codes
+
+
+def _phik_of_pairs(codes:dict, pairs:list, noise_correction=True):
+    """ phi-k of each pair of columns, from the contingency table of their codes (rows with a -1 code left out)
+    nan when a column has less than 2 values on the rows kept, as phik_matrix does """
+    from phik.phik import phik_from_hist2d
+    phik_values = []
+    for x_column, y_column in pairs:
+        (x_codes, x_cardinality), (y_codes, y_cardinality) = codes[x_column], codes[y_column]
+        kept = (x_codes >= 0) & (y_codes >= 0)
+        observed = np.bincount(x_codes[kept] * y_cardinality + y_codes[kept], minlength=x_cardinality * y_cardinality)
+        observed = observed.reshape(x_cardinality, y_cardinality)
+        observed = observed[observed.sum(axis=1) > 0][:, observed.sum(axis=0) > 0]
+        if 0 in observed.shape or 1 in observed.shape:
+            phik_values.append(np.nan)
+        else:
+            phik_values.append(phik_from_hist2d(observed.astype('float64'), noise_correction=noise_correction))
+    return phik_values
+
+
+def _phik_of_shared_pairs(pairs:list):
+    return _phik_of_pairs(_shared_data, pairs)
 
 
-def plotly_build_barplot(df:pd.DataFrame, x_column:str, y_column:str,z_column:str, barplot_title:str, barplot_orientation='h'):
+def phik_correlation_matrix(df:pd.DataFrame, columns:list, interval_columns:list, bins=10, workers=None, noise_correction=True):
+    """ df.phik_matrix() of the columns : the interval columns are binned once,
+    the pairs are computed from integer codes, across workers processes if workers > 1 """
+    codes = _binned_codes(df, columns, interval_columns, bins)
+    pairs = list(combinations(columns, 2))
+    if workers is None or workers <= 1 or len(pairs) <= 1:
+        phik_values = _phik_of_pairs(codes, pairs, noise_correction)
+    else:
+        slice_size = math.ceil(len(pairs) / (workers * 4))
+        slices = [pairs[i:i + slice_size] for i in range(0, len(pairs), slice_size)]
+        with _worker_pool(codes, workers) as executor:
+            phik_values = [value for slice_values in executor.map(_phik_of_shared_pairs, slices) for value in slice_values]
+        _share_data(None)
+
+    matrix = np.eye(len(columns))
+    positions = {column: position for position, column in enumerate(columns)}
+    for (x_column, y_column), phik_value in zip(pairs, phik_values):
+        matrix[positions[x_column], positions[y_column]] = phik_value
+        matrix[positions[y_column], positions[x_column]] = phik_value
+    return pd.DataFrame(matrix, index=columns, columns=columns)
+
+
+def correlation_analysis(df: pd.DataFrame(), values_analysis_results=None, encoding=None, max_categories=100, bins=10,
+                         sample=None, random_state=None, workers=None):
+    """ phi-k correlation matrix of the columns kept by correlation_columns, and the skipped columns
+    sample : amount (int) or fraction (float) of the rows the correlations are computed on, all of them when None """
+    if values_analysis_results is None:
+        values_analysis_results = values_profiling(df, encoding)
+    columns, interval_columns, skipped = correlation_columns(df, values_analysis_results, encoding, max_categories)
+    if sample is not None:
+        df = sample_dataset(df, sample, random_state=random_state)
+    phik_overview = phik_correlation_matrix(df, columns, interval_columns, bins, workers)
+    _log(phik_overview.round(2), 2)
+    return phik_overview, skipped
+
+
+def plotly_build_barplot(df:pd.DataFrame, x_column:str, y_column:str,z_column:str, barplot_title:str, barplot_orientation='h', include_plotlyjs=True):
     """ build a generic staked barplot diagram into html
     x_column : data for x axis
     y column : data for y axis (measured data : must be an int)
-    z column : stacked measured data"""
+    z column : stacked measured data
+    include_plotlyjs : False when the page already has plotly.js (see HtmlReport.write_chart)"""
+    import plotly.express as px
+    import plotly.offline as pof
 
     fig = px.bar(df,
                  x=x_column,
@@ -285,25 +1516,36 @@ def plotly_build_barplot(df:pd.DataFrame, x_column:str, y_column:str,z_column:st
                  color_continuous_scale='OrRd',
                  orientation=barplot_orientation)
 
-    html_heatmap = pof.plot(fig, include_plotlyjs=True, output_type='div')
+    html_heatmap = pof.plot(fig, include_plotlyjs=include_plotlyjs, output_type='div')
 
     return html_heatmap
 
 
-def pie_charting_ordinal_and_binary_values(df:pd.DataFrame,values_analysis_results:pd.DataFrame):
+def pie_charting_ordinal_and_binary_values(df:pd.DataFrame,values_analysis_results:pd.DataFrame, encoding=None, include_plotlyjs=True):
+    """ grid of pie charts (two per row) of the value counts of the binary and ordinal columns, '' if there is none
+    the counts are read from the encoding, the columns missing from it are encoded in one pass over df """
     # list of all the Binary or Ordinal cols (i.e. having less than 10 different values)
     ordinal_and_binary_analysis_df = values_analysis_results[(values_analysis_results['type'] == 'ordinal')|(values_analysis_results['type'] == 'binary')]
-    print(ordinal_and_binary_analysis_df)
+    _log(ordinal_and_binary_analysis_df, 2)
     ordinal_and_binary_df_col_list = ordinal_and_binary_analysis_df['name'].tolist()
-    print(ordinal_and_binary_df_col_list)
+    _log(ordinal_and_binary_df_col_list, 2)
     ordinal_and_binary_col_amount = len(ordinal_and_binary_df_col_list)
-
-    # payload df of only ordinary and binary values
-    df_binary_or_ordinal = df[ordinal_and_binary_df_col_list]
-    print(df_binary_or_ordinal)
+    if ordinal_and_binary_col_amount == 0:
+        return ''
+    import plotly.offline as pof
+    import plotly.graph_objs as go
+    from plotly.subplots import make_subplots
+
+    # counts of only ordinary and binary values
+    if encoding is None:
+        encoding = {}
+    missing_columns = [column for column in ordinal_and_binary_df_col_list if encoding.get(column) is None]
+    if missing_columns:
+        encoding = dict(encoding, **encode_dataset(df[missing_columns]))
 
     # building the grid specifications (specs) and titles
-    rows = round(ordinal_and_binary_col_amount/2)
+    # row computation (/2 car car deux pie par row, arrondi au sup)
+    rows = math.ceil(ordinal_and_binary_col_amount/2)
     cols = 2
     specs = [[{'type':'domain'}] * cols] * rows
     subplot_titles = ordinal_and_binary_df_col_list
@@ -314,41 +1556,37 @@ def pie_charting_ordinal_and_binary_values(df:pd.DataFrame,values_analysis_resul
             cols=cols,
             specs=specs,
             subplot_titles=subplot_titles,
-            print_grid=True) # prints the resulting grid coordinates as stdout :"This is the format of your plot grid:[ (1,1)  ]  [ (1,2)  ]"
+            print_grid=VERBOSITY >= 2) # prints the resulting grid coordinates as stdout :"This is the format of your plot grid:[ (1,1)  ]  [ (1,2)  ]"
 
-    #build individual data and pie chart par column
-    i = 0
+    #build individual data and pie chart par column, added to the canevas all at once
+    traces = []
     for column in ordinal_and_binary_df_col_list:
-        i = i + 1
-        #
-        this_col_values = df_binary_or_ordinal.groupby([column]).agg(count = pd.NamedAgg(column =column, aggfunc= 'count'))
-        this_col_values['value'] = this_col_values.index
-
-        print(this_col_values)
+        # not null values counts, sorted by value as a groupby would (in first appearance order when the values can't be compared)
+        uniques = encoding[column]['uniques']
+        not_null = ~pd.isna(uniques)
+        this_col_values = pd.Series(encoding[column]['counts'][not_null], index=pd.Index(uniques[not_null], name=column), name='count')
+        try:
+            this_col_values = this_col_values.sort_index()
+        except TypeError:
+            pass
+        _log(this_col_values, 2)
+
+        traces.append(go.Pie(labels=this_col_values.index,
+                             values=this_col_values.values,
+                             showlegend=False,
+                             textposition='inside',
+                             textinfo='label+value')) #Any combination of ['label', 'text', 'value', 'percent'] joined with '+' characters (e.g. 'label+text')
+
+    # target positions : odd cols in col 1, even cols in col 2
+    positions = range(ordinal_and_binary_col_amount)
+    fig.add_traces(traces,
+                   rows=[position // 2 + 1 for position in positions],
+                   cols=[position % 2 + 1 for position in positions])
 
-        # compute target position
-        # if impair col = 1 else col = 2
-        if (i % 2) == 0:
-            col_for_this_chart = 2
-        else:
-            col_for_this_chart = 1
-
-        # row computation (/2 car car deux pie par row, arrondi au sup)
-        row_for_this_chart = math.ceil(i/2)
-
-        # populating the canevas position (1,1) with pie charts
-        fig.add_trace(go.Pie(labels=this_col_values['value'],
-                            values=this_col_values['count'],
-                            showlegend=False,
-                            textposition='inside',
-                            textinfo='label+value'), #Any combination of ['label', 'text', 'value', 'percent'] joined with '+' characters (e.g. 'label+text')
-                    row=row_for_this_chart,
-                    col=col_for_this_chart)
-    
     fig.update_layout(title="Binary & Ordinal Values analysis", title_x=0.5)
 
     # output
-    html_result = pof.plot(fig, include_plotlyjs=True, output_type='div')
+    html_result = pof.plot(fig, include_plotlyjs=include_plotlyjs, output_type='div')
 
     return html_result
 
@@ -376,9 +1614,69 @@ def false_colorization(cell_value):
     return highlight
 
 
-def profile_dataset(df: pd.DataFrame(), output_html_file: str):
-    """ Dataprofiling pipeline """
-    
+def _timed(timings:dict, name:str, function, *args):
+    """ function(*args), its wall and cpu seconds stored in timings[name] """
+    wall_start, cpu_start = time.perf_counter(), time.process_time()
+    result = function(*args)
+    timings[name] = (time.perf_counter() - wall_start, time.process_time() - cpu_start)
+    return result
+
+
+# per column analyses of profile_column
+COLUMN_ANALYSES = ('nulls', 'values', 'whitespace', 'regex')
+
+
+def profile_column(column:pd.Series, analyses=COLUMN_ANALYSES):
+    """ per column profiling : encoding, then the analyses among nulls, values, whitespace and regex (on the trimmed distinct values)
+    timings : wall and cpu seconds of each analysis """
+    timings = {}
+    column_encoding = _timed(timings, 'encoding', encode_column, column)
+    column_profile = {'encoding': column_encoding, 'timings': timings}
+    if 'nulls' in analyses:
+        column_profile['nulls'] = _timed(timings, 'nulls', null_analysis, column, column_encoding)
+    if 'values' in analyses:
+        column_profile['values'] = _timed(timings, 'values', lambda: _values_analysis(column.name, column_encoding['uniques'].values.tolist()))
+    if 'whitespace' in analyses:
+        column_profile['whitespace'] = _timed(timings, 'whitespace', lambda: whitespace_analysis(column.name, _not_null_uniques(column_encoding)))
+    if 'regex' in analyses:
+        column_profile['regex'] = _timed(timings, 'trim + regex',
+                                         lambda: regex_analysis(column.name, _not_null_uniques(trim_column_encoding(column_encoding))))
+    return column_profile
+
+
+def _profile_column_without_codes(column:pd.Series, analyses=COLUMN_ANALYSES):
+    """ profile_column whose encoding has no row codes, the only part sent back by the workers """
+    column_profile = profile_column(column, analyses)
+    del column_profile['encoding']['codes']
+    return column_profile
+
+
+def _profile_shared_column(position:int, analyses=COLUMN_ANALYSES):
+    return _profile_column_without_codes(_shared_data.iloc[:, position], analyses)
+
+
+def profile_columns(df:pd.DataFrame, workers=None, analyses=COLUMN_ANALYSES):
+    """ profile_column of every column, in the columns order, fanned out to a pool of workers processes if workers > 1
+    the workers send back the encodings without their row codes (uniques and counts only) :
+    _key_codes encodes the columns again when the keys or dependencies need them
+    forked workers read df from the parent memory, else each column is only sent to the worker profiling it """
+    positions = range(len(df.columns))
+    if workers is None or workers <= 1 or len(df.columns) <= 1:
+        return [profile_column(df.iloc[:, position], analyses) for position in positions]
+
+    if 'fork' not in multiprocessing.get_all_start_methods():
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(_profile_column_without_codes, (df.iloc[:, position] for position in positions),
+                                     [analyses] * len(positions)))
+
+    with _worker_pool(df, workers) as executor:
+        column_profiles = list(executor.map(_profile_shared_column, positions, [analyses] * len(positions)))
+    _share_data(None)
+    return column_profiles
+
+
+def table_styles():
+    """ CSS properties of the html tables """
     # Set CSS properties for th elements in dataframe
     th_props = [('font-size', '14px'),
                 ('text-align', 'center'),
@@ -396,76 +1694,199 @@ def profile_dataset(df: pd.DataFrame(), output_html_file: str):
     styles = [dict(selector="th", props=th_props),
     dict(selector="td", props=td_props)]
 
-    # 28/10/2022 : test de décommisionner bootsrap et d'utiliser directement df.style
-    # html_results = init_html_results()
-    html_results = ''
+    return styles
 
-    # !!!!!! ci dessus a ajouter dans la parstie HTMLisée !!!!!!!!
-    print(f"\ndf.shape() : {(df.shape)[1]} colonnes ; {(df.shape)[0]} lignes (hors entete)")
-    html_result = "<BR>Data shape (df.Shape()) :"
-    html_result = html_result + "<BR>df.shape : " + str((df.shape)[1]) + " columns"
-    html_result = html_result + "<BR>df.shape : " + str((df.shape)[0]) + " lignes (hors entete)<BR>"
-    html_results = html_results + html_result
 
-    print("\nCheck that there is no duplicated col name")
-    columns_amount = len(df.columns.values.tolist())
-    distinct_col_amount = len(set(df.columns.values.tolist()))
-    print(f" The dataset has {columns_amount} columns, of which {distinct_col_amount} are distinct")
+def shape_section(columns:list, rows_amount:int):
+    """ data shape and duplicated column names check """
+    _log(f"\ndf.shape() : {len(columns)} colonnes ; {rows_amount} lignes (hors entete)")
+    html_results = "<BR>Data shape (df.Shape()) :"
+    html_results = html_results + "<BR>df.shape : " + str(len(columns)) + " columns"
+    html_results = html_results + "<BR>df.shape : " + str(rows_amount) + " lignes (hors entete)<BR>"
+
+    _log("\nCheck that there is no duplicated col name")
+    columns_amount = len(columns)
+    distinct_col_amount = len(set(columns))
+    _log(f" The dataset has {columns_amount} columns, of which {distinct_col_amount} are distinct")
     if columns_amount != distinct_col_amount:
-        print("!!!!!!!! WARNING - duplicated column name : the analysis will be KO ")
+        _log("!!!!!!!! WARNING - duplicated column name : the analysis will be KO ", 0)
     html_result = "<BR>Check that there is no duplicated col name :"
     html_result = html_result + "<BR> The dataset has " + str(columns_amount) + " columns, of which " + str(distinct_col_amount) + " are distinct<BR>"
     html_results = html_results + html_result
 
-    # df.head(10)
-    result = df.head(10)
-    result = result.astype('str')
+    return html_results
+
+
+def parquet_statistics_section(result:pd.DataFrame, styles:list):
+    """ result : parquet_statistics, min and max of every column from the parquet metadata """
+    result = result[['name', 'len', 'nulls', 'min', 'max']].astype({'min': 'str', 'max': 'str'})
     styled_result = result.style.set_table_styles(styles)
-    html_result = result_output(styled_result,'df.head(10)')
-    html_results = html_results + html_result
+    return result_output(styled_result,'Min / max (parquet metadata statistics)')
+
+
+def dependencies_section(result:pd.DataFrame, max_lhs_length:int, max_error:float, styles:list):
+    """ result : functional_dependency_profiling """
+    title = 'Dépendances fonctionnelles minimales lhs -> rhs [paramétré pour des lhs d\'une longueur max de ' + str(max_lhs_length) + ' colonnes, erreur max ' + str(round(max_error * 100, 2)) + ' %]'
+    if len(result) == 0:
+        return '<BR>' + title + ' : no functional dependency found<BR>'
+    styled_result = result.style.applymap(true_colorization, subset=['exact']).applymap(false_colorization, subset=['exact']).format(precision=2, subset=['error_%']).set_table_styles(styles)
+    return result_output(styled_result,title)
+
+
+def correlation_heatmap(matrix:pd.DataFrame):
+    """ html image (embedded png) of plot_correlation_matrix """
+    from phik.report import plot_correlation_matrix
+    import matplotlib.pyplot as plt
+    size = len(matrix)
+    plot_correlation_matrix(matrix.values, x_labels=matrix.columns, y_labels=matrix.index, vmin=0, vmax=1, color_map='Blues',
+                            title=r'correlation $\phi_K$', fontsize_factor=1.2, figsize=(max(7, size * 0.7), max(5, size * 0.6)))
+    figure = plt.gcf()
+    png = io.BytesIO()
+    figure.savefig(png, format='png', bbox_inches='tight')
+    plt.close(figure)
+    return '<img src="data:image/png;base64,' + base64.b64encode(png.getvalue()).decode('ascii') + '">'
+
+
+def correlation_section(matrix:pd.DataFrame, skipped:dict, styles:list):
+    """ matrix : correlation_analysis phi-k matrix, skipped : columns left out of it with the reason """
+    title = 'Correlation analysis (phi-k)'
+    _log('\n' + title)
+    if len(matrix) < 2:
+        html_results = '<BR>' + title + ' : less than 2 columns to correlate<BR>'
+    else:
+        html_results = '<BR>' + title + '<BR>' + correlation_heatmap(matrix)
+    if skipped:
+        result = pd.DataFrame({'name': list(skipped), 'skipped because': list(skipped.values())})
+        html_results = html_results + result_output(result.style.set_table_styles(styles), 'Columns left out of the correlation analysis')
+    return html_results
 
-    # Missing value analysis
-    result = null_profiling(df)
+
+def sampling_section(result:pd.DataFrame, sample_method:str, styles:list):
+    """ result : sampling_profiling of the sample the other sections are computed on """
+    sample_len = result['sample_len'].max() if len(result) else 0
+    population_len = result['len'].max() if len(result) else 0
+    _log(f"\nProfiled on a {sample_method} sample of {sample_len} lignes out of {population_len}")
+    html_results = "<BR>Profiled on a " + sample_method + " sample of " + str(sample_len) + " lignes out of " + str(population_len)
+    html_results = html_results + " : df.head and the business keys are computed on the whole data, the other sections on the sample<BR>"
+    styled_result = result.style.bar(subset=["null_%"]).format(precision=2, subset=["null_%", "null_%_low", "null_%_high"]).set_table_styles(styles)
+    return html_results + result_output(styled_result,'Sampling estimates (95% confidence intervals)')
+
+
+def instrumentation_section(result:pd.DataFrame, styles:list):
+    """ result : StageProfiler results, the 'columns profiling / ...' rows add up the time of each analysis over the columns """
+    styled_result = result.style.bar(subset=["wall_s"]).format(precision=3, na_rep='').set_table_styles(styles)
+    return result_output(styled_result,'Stages wall time, cpu time, peak memory (MB) and rows per second')
+
+
+def head_section(head:pd.DataFrame, styles:list):
+    result = head.astype('str')
+    styled_result = result.style.set_table_styles(styles)
+    return result_output(styled_result,'df.head(10)')
+
+
+def null_section(result:pd.DataFrame, styles:list):
     styled_result = result.style.background_gradient(subset=["nulls"]).bar(subset=["null_%"]).format(precision=2, subset=["null_%"]).set_table_styles(styles)
     html_result = result_output(styled_result,'Missing value analysis')
-    html_results = html_results + html_result
     # barchart hereunder less useful is barcahrt already appearing as a style in the above table
     # html_result_graph = plotly_build_barplot(result,'null_%','name','nulls','Null analysis','h')
-    # html_results = html_results + html_result_graph
+    # html_result = html_result + html_result_graph
+    return html_result
 
-    # df.describe() numeric cols
-    result = df.describe(include='number').T
+
+def _describe_table(describe:pd.DataFrame):
+    """ transposed df.describe() with the column names as first column """
+    result = describe.T
     # le nom de la colonne passe en index, on la remet comme col en 1ere position
     result['Attribut'] = result.index
     first_column = result.pop('Attribut')
     result.insert(0, 'Attribut', first_column)
     result = result.reset_index()
+    return result
+
+
+def numeric_describe_section(describe:pd.DataFrame, styles:list):
+    """ describe : df.describe(include='number') """
+    result = _describe_table(describe)
     #graphic design
     styled_result = result.style.background_gradient(subset=['count']).format(precision=0).set_table_styles(styles)
     # export
-    html_result = result_output(styled_result,'df.describe() numeric cols')
-    html_results = html_results + html_result
+    return result_output(styled_result,'df.describe() numeric cols')
 
-    #df.describe() non numeric cols
-    result = df.describe(exclude='number').T
-    # le nom de la colonne passe en index, on la remet comme col en 1ere position
-    result['Attribut'] = result.index
-    first_column = result.pop('Attribut')
-    result.insert(0, 'Attribut', first_column)
-    result = result.reset_index()
+
+def non_numeric_describe_section(describe:pd.DataFrame, styles:list):
+    """ describe : df.describe(exclude='number') """
+    result = _describe_table(describe)
     #graphic design
     styled_result = result.style.background_gradient(subset=['count']).background_gradient(subset=['unique']).background_gradient(subset=['freq']).set_table_styles(styles)
     # export
-    html_result = result_output(styled_result,'df.describe() non numeric cols')
-    html_results = html_results + html_result
+    return result_output(styled_result,'df.describe() non numeric cols')
 
-    # Values profiling
-    result = values_profiling(df)
+
+def values_section(result:pd.DataFrame, styles:list):
     styled_result = result.style.applymap(binary_colorization).applymap(ordinal_colorization).applymap(continuous_colorization).set_table_styles(styles)
-    html_result = result_output(styled_result,'Values profiling')
-    html_results = html_results + html_result
-    html_result_graph = pie_charting_ordinal_and_binary_values(df,result)
-    html_results = html_results + html_result_graph
+    return result_output(styled_result,'Values profiling')
+
+
+def whitespace_section(result:pd.DataFrame, styles:list):
+    styled_result = result.style.set_table_styles(styles)
+    return result_output(styled_result,'Whitespace analysis')
+
+
+def regex_section(result:pd.DataFrame, styles:list):
+    styled_result = result.style.applymap(true_colorization).applymap(false_colorization).set_table_styles(styles)
+    return result_output(styled_result,'Regex matcher (for not null cols) - after trimming whitespaces and excluding null values withon columns.')
+
+
+def keys_section(result:pd.DataFrame, max_key_length:int, styles:list):
+    title = 'Clef retenues [paramétré pour chercher les combinaisons d\'une longueur max de ' + str(max_key_length) +' colonnes]'
+    keys_df = result[result['is_key'] == True]
+    if len(keys_df) == 0:
+        html_results = 'no PK found '
+    else:
+        styled_result = keys_df.style.applymap(true_colorization).applymap(false_colorization).set_table_styles(styles)
+        html_results = result_output(styled_result,title)
+    title = 'Recherche des clefs métier [paramétré pour chercher les combinaisons d\'une longueur max de ' + str(max_key_length) +' colonnes]'
+    styled_result = result.style.applymap(true_colorization).applymap(false_colorization).set_table_styles(styles)
+    html_results = html_results + result_output(styled_result,title)
+    return html_results
+
+
+def _write_head(run:dict):
+    with run['profiler'].stage('head'):
+        html = head_section(run['df'].head(10), run['styles'])
+    run['report'].write(html)
+
+
+def _write_nulls(run:dict):
+    # Missing value analysis
+    with run['profiler'].stage('nulls', len(run['profiled_df'])):
+        result = pd.DataFrame([column_profile['nulls'] for column_profile in run['column_profiles']])
+        html = null_section(result, run['styles'])
+    run['report'].write(html)
+
+
+def _write_describe(run:dict):
+    # df.describe() numeric cols (skipped without any, as when every column is read as text)
+    if len(run['profiled_df'].select_dtypes(include='number').columns) > 0:
+        with run['profiler'].stage('describe numeric', len(run['profiled_df'])):
+            html = numeric_describe_section(run['profiled_df'].describe(include='number'), run['styles'])
+        run['report'].write(html)
+
+    #df.describe() non numeric cols
+    if len(run['profiled_df'].select_dtypes(exclude='number').columns) > 0:
+        with run['profiler'].stage('describe non numeric', len(run['profiled_df'])):
+            html = non_numeric_describe_section(non_numeric_describe(run['profiled_df'], run['encoding']), run['styles'])
+        run['report'].write(html)
+
+
+def _write_values(run:dict):
+    with run['profiler'].stage('values', len(run['profiled_df'])):
+        html = values_section(run['values_analysis_results'], run['styles'])
+    run['report'].write(html)
+    with run['profiler'].stage('pie charts', len(run['profiled_df'])):
+        html_result_graph = pie_charting_ordinal_and_binary_values(run['profiled_df'], run['values_analysis_results'], run['encoding'],
+                                                                   include_plotlyjs=False)
+    run['report'].write_chart(html_result_graph)
     # TODO : replace plein de pie chart par un barchart :
     # |
     # |    nuke               EDF
@@ -474,49 +1895,1024 @@ def profile_dataset(df: pd.DataFrame(), output_html_file: str):
     #       Type              proprio
     # print(result)
     # html_result_graph2 = plotly_build_barplot(result)
-    # html_results = html_results + html_result_graph2
+    # report.write_chart(html_result_graph2)
+
+
+def _write_whitespace(run:dict):
+    with run['profiler'].stage('whitespace', len(run['profiled_df'])):
+        result = pd.DataFrame([column_profile['whitespace'] for column_profile in run['column_profiles']])
+        html = whitespace_section(result, run['styles'])
+    run['report'].write(html)
 
-    # Whitespace analysis"
-    result = whitespace_profiling(df)
-    styled_result = result.style.set_table_styles(styles)
-    html_result = result_output(styled_result,'Whitespace analysis')
-    html_results = html_results + html_result
 
+def _write_regex(run:dict):
     #Regex matcher (for not null cols) - after trimming whitespaces and excluding null values within columns ")
     # df is trimmed since trailing/leading whitespace make regex profiling less interesting 
     # (and because most of the time data is trimmed before use)
-    trimed_df = df.copy() # else df and trimed_df points toward the same in_memory references hence modifying df instead of only trimed_df
-    trimed_df = trim(trimed_df)
-    result = regex_profiling(trimed_df)
-    styled_result = result.style.applymap(true_colorization).applymap(false_colorization).set_table_styles(styles)
-    html_result = result_output(styled_result,'Regex matcher (for not null cols) - after trimming whitespaces and excluding null values withon columns.')
-    html_results = html_results + html_result
+    # only the distinct values are trimmed and checked, instead of a trimmed copy of the whole df
+    with run['profiler'].stage('trim + regex', len(run['profiled_df'])):
+        result = pd.DataFrame([column_profile['regex'] for column_profile in run['column_profiles']])
+        html = regex_section(result, run['styles'])
+    run['report'].write(html)
+
+
+def _write_keys(run:dict):
+    #Recherche des clefs métier (vérifiées sur toutes les lignes quand les profilers tournent sur un échantillon)
+    with run['profiler'].stage('keys'):
+        if run['sample'] is None:
+            result = business_key_profiling(run['df'], run['max_key_length'], run['encoding'], run['workers'])
+        else:
+            result = business_key_profiling(run['df'], run['max_key_length'], None, run['workers'], run['profiled_df'], run['encoding'])
+        html = keys_section(result, run['max_key_length'], run['styles'])
+    run['report'].write(html)
 
-    #Recherche des clefs métier
-    max_key_length = 3
-    result = business_key_profiling(df,max_key_length)
-    title = 'Clef retenues [paramétré pour chercher les combinaisons d\'une longueur max de ' + str(max_key_length) +' colonnes]'
-    keys_df = result[result['is_key'] == True]
-    if len(keys_df) == 0:
-        html_result = 'no PK found '
-    else:
-        styled_result = keys_df.style.applymap(true_colorization).applymap(false_colorization).set_table_styles(styles)
-        html_result = result_output(styled_result,title)
-    html_results = html_results + html_result
-    title = 'Recherche des clefs métier [paramétré pour chercher les combinaisons d\'une longueur max de ' + str(max_key_length) +' colonnes]'
-    styled_result = result.style.applymap(true_colorization).applymap(false_colorization).set_table_styles(styles)
-    html_result = result_output(styled_result,title)
-    html_results = html_results + html_result
 
+def _write_dependencies(run:dict):
+    #Recherche des dépendances fonctionnelles (sur toutes les lignes, comme les clefs)
+    with run['profiler'].stage('functional dependencies'):
+        result = functional_dependency_profiling(run['df'], run['max_lhs_length'], run['max_dependency_error'],
+                                                 run['encoding'] if run['sample'] is None else None)
+        html = dependencies_section(result, run['max_lhs_length'], run['max_dependency_error'], run['styles'])
+    run['report'].write(html)
+
+
+def _write_correlation(run:dict):
     # Correlation analysis using phi(k)
-    # to do : comprendre comment ça marche pour le rendre raisonnablement executable en temps
-    # correlation_analysis(df)
-
-    # output as html 
-    html_file=open(output_html_file,"w")
-    html_file.write(html_results)
-    html_file.close
-        
+    # constant and near unique text columns are skipped, numeric columns are binned once and the pairs run on integer codes
+    with run['profiler'].stage('correlation', len(run['profiled_df'])):
+        correlation_matrix, skipped_columns = correlation_analysis(run['profiled_df'], run['values_analysis_results'], run['encoding'],
+                                                                   sample=run['correlation_sample'], random_state=run['random_state'],
+                                                                   workers=run['workers'])
+        html = correlation_section(correlation_matrix, skipped_columns, run['styles'])
+    run['report'].write(html)
+
+
+def _write_timings(run:dict):
+    # Temps d'exécution par étape (l'écriture de cette dernière section n'y est pas comptée)
+    run['report'].write(instrumentation_section(run['profiler'].results(), run['styles']))
+
+
+# report sections of profile_dataset, in the report order : name -> (profile_column analyses it reads, writer of the section)
+# (the shape, and the sampling estimates of a sample, are always written)
+SECTION_REGISTRY = {}
+PROFILE_SECTIONS = []
+
+
+def register_section(name:str, writer, analyses=(), before=None):
+    """ adds (or replaces) a profile_dataset report section
+    writer(run) computes the section and writes it to run['report'], run being the profile_dataset state : df, profiled_df,
+    encoding, column_profiles, values_analysis_results, styles, report, profiler and the profile_dataset options
+    analyses : the COLUMN_ANALYSES the section reads in run['column_profiles'] ('values' for run['values_analysis_results'])
+    before : name of the section it is written before, it is written last when None """
+    sections = [(section, entry) for section, entry in SECTION_REGISTRY.items() if section != name]
+    position = len(sections) if before is None else [section for section, _ in sections].index(before)
+    sections.insert(position, (name, (tuple(analyses), writer)))
+    SECTION_REGISTRY.clear()
+    SECTION_REGISTRY.update(sections)
+    PROFILE_SECTIONS[:] = list(SECTION_REGISTRY)
+
+
+register_section('head', _write_head)
+register_section('nulls', _write_nulls, ['nulls'])
+register_section('describe', _write_describe)
+register_section('values', _write_values, ['values'])
+register_section('whitespace', _write_whitespace, ['whitespace'])
+register_section('regex', _write_regex, ['regex'])
+register_section('keys', _write_keys)
+register_section('dependencies', _write_dependencies)
+register_section('correlation', _write_correlation, ['values'])
+register_section('timings', _write_timings)
+
+
+def profile_dataset(df: pd.DataFrame(), output_html_file: str, workers=None, sample=None, sample_method='uniform', stratify_column=None, random_state=None,
+                    correlation_sample=None, profiler=None, timings_json_file=None, sections=None, max_key_length=3,
+                    max_lhs_length=2, max_dependency_error=0.0):
+    """ Dataprofiling pipeline
+    workers : amount of processes profiling the columns (nulls, values, whitespace and regex)
+    and evaluating the business keys candidates in parallel
+    sample : amount (int) or fraction (float) of rows the profilers run on, the whole df when None
+    (see sample_dataset for sample_method, stratify_column and random_state),
+    the business keys found on the sample are verified on the whole df
+    correlation_sample : amount (int) or fraction (float) of the rows the phi-k correlations are computed on
+    each section is written to output_html_file as soon as it is computed (see HtmlReport)
+    profiler : StageProfiler recording the time, memory and throughput of each stage (a default one when None),
+    reported in the timings section and written to timings_json_file, returned
+    sections : the PROFILE_SECTIONS computed and written (see register_section), in the report order, all of them when None
+    max_key_length : longest column combinations checked by the business keys search
+    max_lhs_length, max_dependency_error : longest lhs and g3 error of the functional dependencies (see functional_dependency_profiling) """
+    
+    sections = PROFILE_SECTIONS if sections is None else sections
+    unknown_sections = set(sections) - set(PROFILE_SECTIONS)
+    if unknown_sections:
+        raise ValueError(f"unknown sections {sorted(unknown_sections)}, the sections are {PROFILE_SECTIONS}")
+    selected_sections = [section for section in PROFILE_SECTIONS if section in sections]
+    styles = table_styles()
+    if profiler is None:
+        profiler = StageProfiler(len(df))
+    elif profiler.rows_amount is None:
+        profiler.rows_amount = len(df)
+
+    # 28/10/2022 : test de décommisionner bootsrap et d'utiliser directement df.style
+    # html_results = init_html_results()
+    with HtmlReport(output_html_file, profiler) as report:
+
+        # !!!!!! ci dessus a ajouter dans la parstie HTMLisée !!!!!!!!
+        report.write(shape_section(df.columns.values.tolist(), (df.shape)[0]))
+
+        # every column is dictionary encoded once, the profilers below work on its codes, uniques and counts
+        # the per column analyses of the selected sections are all computed upfront, in parallel when there are workers
+        if sample is None:
+            profiled_df = df
+        else:
+            with profiler.stage('sampling'):
+                profiled_df = sample_dataset(df, sample, sample_method, stratify_column, random_state)
+        analyses = [analysis for analysis in COLUMN_ANALYSES
+                    if any(analysis in SECTION_REGISTRY[section][0] for section in selected_sections)]
+        with profiler.stage('columns profiling', len(profiled_df)):
+            column_profiles = profile_columns(profiled_df, workers, analyses)
+        encoding = {column: column_profile['encoding'] for column, column_profile in zip(df.columns, column_profiles)}
+        # time spent on each analysis, summed over the columns (and over the workers processes)
+        for analysis in column_profiles[0]['timings'] if column_profiles else []:
+            profiler.add('columns profiling / ' + analysis, sum(column_profile['timings'][analysis][0] for column_profile in column_profiles),
+                         sum(column_profile['timings'][analysis][1] for column_profile in column_profiles), len(profiled_df))
+
+        # Sampling estimates
+        if sample is not None:
+            with profiler.stage('sampling estimates', len(profiled_df)):
+                html = sampling_section(sampling_profiling(encoding, len(df)), sample_method, styles)
+            report.write(html)
+
+        run = {'df': df, 'profiled_df': profiled_df, 'encoding': encoding, 'column_profiles': column_profiles,
+               'values_analysis_results': None, 'styles': styles, 'report': report, 'profiler': profiler,
+               'workers': workers, 'sample': sample, 'random_state': random_state, 'correlation_sample': correlation_sample,
+               'max_key_length': max_key_length, 'max_lhs_length': max_lhs_length, 'max_dependency_error': max_dependency_error}
+        if 'values' in analyses:
+            run['values_analysis_results'] = pd.DataFrame([column_profile['values'] for column_profile in column_profiles])
+        for section in selected_sections:
+            SECTION_REGISTRY[section][1](run)
+
+    if timings_json_file is not None:
+        profiler.to_json(timings_json_file)
+    return profiler
+
+
+def profile_parquet(parquet:str, output_html_file:str, columns=None, metadata_only=False, **profile_options):
+    """ Dataprofiling pipeline of a parquet file, only the given columns (all of them when None) are read
+    metadata_only : the shape, missing values and min/max sections are built from the parquet metadata statistics,
+    without reading the data
+    profile_options : profile_dataset options (workers, sample...) """
+    if not metadata_only:
+        profile_dataset(import_parquet_dataset(parquet, columns), output_html_file, **profile_options)
+        return
+
+    styles = table_styles()
+    statistics = parquet_statistics(parquet, columns)
+    rows_amount = pq.ParquetFile(parquet, memory_map=True).metadata.num_rows
+    with HtmlReport(output_html_file) as report:
+        report.write(shape_section(statistics['name'].tolist(), rows_amount))
+
+        # Missing value analysis
+        report.write(null_section(statistics[['name', 'len', 'nulls', 'null_%']], styles))
+
+        # min / max
+        report.write(parquet_statistics_section(statistics, styles))
+
+
+def profile_sql_table(database:str, table:str, output_html_file:str, max_key_length=3):
+    """ Dataprofiling pipeline of a table (or view) of a local database file (see sql_connection), without loading it :
+    the missing values, describe, values and business keys sections are computed by the database """
+    styles = table_styles()
+    connection = sql_connection(database)
+    profiler = StageProfiler()
+    try:
+        with HtmlReport(output_html_file, profiler) as report:
+            with profiler.stage('nulls'):
+                null_result = sql_null_profiling(connection, table)
+                profiler.rows_amount = int(null_result['len'].max()) if len(null_result) else 0
+            report.write(shape_section(null_result['name'].tolist(), profiler.rows_amount))
+            report.write(null_section(null_result, styles))
+
+            with profiler.stage('describe numeric'):
+                numeric_columns = sql_numeric_columns(connection, table)
+                html = numeric_describe_section(sql_numeric_describe(connection, table, numeric_columns), styles)
+            report.write(html)
+            with profiler.stage('describe non numeric'):
+                non_numeric_columns = [column for column in null_result['name'] if column not in numeric_columns]
+                html = non_numeric_describe_section(sql_non_numeric_describe(connection, table, non_numeric_columns), styles)
+            report.write(html)
+
+            with profiler.stage('values'):
+                html = values_section(sql_values_profiling(connection, table, null_result), styles)
+            report.write(html)
+
+            with profiler.stage('keys'):
+                html = keys_section(sql_business_key_profiling(connection, table, max_key_length, null_result), max_key_length, styles)
+            report.write(html)
+
+            report.write(instrumentation_section(profiler.results(), styles))
+    finally:
+        connection.close()
+    return profiler
+
+
+# file extensions of the datasets found in a directory (see dataset_files)
+DATASET_EXTENSIONS = ('.csv', '.txt', '.xlsx', '.xls', '.parquet', '.feather', '.arrow')
+CSV_EXTENSIONS = ('.csv', '.txt')
+# profile_files modes
+PROFILE_MODES = ['memory', 'chunks', 'incremental', 'metadata']
+
+
+def import_dataset(file_path:str, separateur=";", encodage='utf-8', all_as_string=False):
+    """ Import data for profiling with the importer of the file extension (csv and txt files are csv) """
+    extension = os.path.splitext(file_path)[1].lower()
+    if extension in ('.xlsx', '.xls'):
+        return import_excel_dataset(file_path)
+    if extension == '.parquet':
+        return import_parquet_dataset(file_path)
+    if extension in ('.feather', '.arrow'):
+        return import_feather_dataset(file_path)
+    return import_csv_dataset(file_path, separateur, encodage, all_as_string=all_as_string)
+
+
+def dataset_files(paths:list):
+    """ files of the paths, sorted and without duplicates :
+    a directory gives its DATASET_EXTENSIONS files, a glob pattern its matching files, a file itself """
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(os.path.join(path, name) for name in os.listdir(path)
+                         if os.path.splitext(name)[1].lower() in DATASET_EXTENSIONS and os.path.isfile(os.path.join(path, name)))
+        elif os.path.isfile(path):
+            files.append(path)
+        else:
+            files.extend(match for match in glob.glob(path, recursive=True) if os.path.isfile(match))
+    return sorted(set(files))
+
+
+def _report_names(file_paths:list):
+    """ html report name of each file : its name with .html, numbered when two files have the same name """
+    names = []
+    for file_path in file_paths:
+        stem = os.path.splitext(os.path.basename(file_path))[0]
+        name = stem + '.html'
+        number = 2
+        while name in names:
+            name = stem + '_' + str(number) + '.html'
+            number = number + 1
+        names.append(name)
+    return names
+
+
+def _profile_file(file_path:str, output_html_file:str, import_options:dict, profile_options:dict, mode='memory', chunk_options=None):
+    """ profiles a file into output_html_file (see profile_files for the modes) and returns its summary row,
+    an error doesn't stop the batch : it is reported in the status of the row """
+    summary = {'file': file_path, 'report': os.path.basename(output_html_file), 'status': 'ok', 'rows': None, 'columns': None,
+               'null_cells_%': None, 'seconds': None, 'slowest_stage': None}
+    chunk_options = {} if chunk_options is None else chunk_options
+    extension = os.path.splitext(file_path)[1].lower()
+    started = time.perf_counter()
+    try:
+        if mode in ('chunks', 'incremental') and extension in CSV_EXTENSIONS:
+            csv_options = {'separateur': import_options.get('separateur', ';'), 'encodage': import_options.get('encodage', 'utf-8')}
+            if mode == 'chunks':
+                accumulators = profile_csv_by_chunks(file_path, output_html_file, **csv_options, **chunk_options)
+            else:
+                accumulators = profile_csv_incremental(file_path, output_html_file, **csv_options, workers=profile_options.get('workers'),
+                                                       **chunk_options)
+            rows_amount = next(iter(accumulators.values())).rows if accumulators else 0
+            summary['rows'], summary['columns'] = rows_amount, len(accumulators)
+            cells = rows_amount * len(accumulators)
+            summary['null_cells_%'] = round(100 * sum(accumulator.nulls for accumulator in accumulators.values()) / cells, 2) if cells else 0.0
+        elif mode == 'metadata' and extension == '.parquet':
+            profile_parquet(file_path, output_html_file, metadata_only=True)
+            statistics = parquet_statistics(file_path)
+            summary['rows'], summary['columns'] = pq.ParquetFile(file_path).metadata.num_rows, len(statistics)
+            cells = summary['rows'] * summary['columns']
+            summary['null_cells_%'] = round(100 * float(statistics['nulls'].sum()) / cells, 2) if cells else 0.0
+        else:
+            df = import_dataset(file_path, **import_options)
+            summary['rows'], summary['columns'] = df.shape
+            summary['null_cells_%'] = round(100 * int(df.isna().sum().sum()) / df.size, 2) if df.size else 0.0
+            timings = profile_dataset(df, output_html_file, **profile_options).results()
+            # the column profiling analyses are part of the 'columns profiling' stage
+            timings = timings[~timings['stage'].str.startswith('columns profiling / ')]
+            if len(timings) > 0:
+                summary['slowest_stage'] = timings.loc[timings['wall_s'].idxmax(), 'stage']
+    except Exception as error:
+        # a report left by a failed profiling is incomplete : it isn't linked from the index
+        summary['status'] = type(error).__name__ + ' : ' + str(error)
+        summary['report'] = None
+    summary['seconds'] = round(time.perf_counter() - started, 3)
+    _log(f"{file_path} : {summary['status']} ({summary['seconds']} s)")
+    return summary
+
+
+def profile_files(file_paths:list, output_dir:str, jobs=None, import_options=None, profile_options=None, mode='memory', chunk_options=None):
+    """ Dataprofiling pipeline of many files : a report per file in output_dir, then index.html (the summary with links to
+    the reports) and summary.csv
+    jobs : files profiled at the same time by a pool of processes, each one profiling several files with the libraries
+    already imported (forked from this process when possible), the cpu count when None
+    import_options : import_dataset options (separateur, encodage, all_as_string)
+    profile_options : profile_dataset options (workers, sample, sections, max_key_length...)
+    mode : how the files larger than the memory are profiled, the other files being loaded whole (import_dataset)
+    'memory' : every file loaded whole, 'chunks' : the csv files by profile_csv_by_chunks,
+    'incremental' : the csv files by profile_csv_incremental (with its cache), 'metadata' : the parquet files from their metadata only
+    (database tables aren't files : see profile_sql_table)
+    chunk_options : profile_csv_by_chunks / profile_csv_incremental options (chunksize, approximate, max_key_length...)
+    returns the summary, one row per file """
+    if mode not in PROFILE_MODES:
+        raise ValueError(f"unknown mode {mode}, the modes are {PROFILE_MODES}")
+    import_options = {} if import_options is None else import_options
+    profile_options = {} if profile_options is None else profile_options
+    os.makedirs(output_dir, exist_ok=True)
+    output_html_files = [os.path.join(output_dir, name) for name in _report_names(file_paths)]
+
+    if jobs == 1 or len(file_paths) <= 1:
+        rows = [_profile_file(file_path, output_html_file, import_options, profile_options, mode, chunk_options)
+                for file_path, output_html_file in zip(file_paths, output_html_files)]
+    else:
+        context = multiprocessing.get_context('fork') if 'fork' in multiprocessing.get_all_start_methods() else None
+        with ProcessPoolExecutor(max_workers=jobs, mp_context=context) as executor:
+            rows = list(executor.map(_profile_file, file_paths, output_html_files, [import_options] * len(file_paths),
+                                     [profile_options] * len(file_paths), [mode] * len(file_paths), [chunk_options] * len(file_paths)))
+
+    summary = pd.DataFrame(rows, columns=['file', 'report', 'status', 'rows', 'columns', 'null_cells_%', 'seconds', 'slowest_stage'])
+    summary[['rows', 'columns']] = summary[['rows', 'columns']].astype('Int64')
+    summary.to_csv(os.path.join(output_dir, 'summary.csv'), index=False)
+    with HtmlReport(os.path.join(output_dir, 'index.html')) as report:
+        report.write(batch_index_section(summary, table_styles()))
+    return summary
+
+
+def batch_index_section(summary:pd.DataFrame, styles:list):
+    # file names and error messages are escaped, the report links quoted
+    styled_result = summary.style.format(precision=2, na_rep='', escape='html')
+    styled_result = styled_result.format({'report': lambda report: '<a href="' + html_escape(urllib.parse.quote(report)) + '">'
+                                                                   + html_escape(report) + '</a>'}, subset=['report'], na_rep='')
+    styled_result = styled_result.applymap(lambda status: '' if status == 'ok' else 'background-color: lightcoral', subset=['status'])
+    return result_output(styled_result.set_table_styles(styles), 'Profiled files : ' + str(len(summary)))
+
+
+class HyperLogLog:
+    """ distinct count sketch (Flajolet et al.) of 2 ** precision registers,
+    relative standard error 1.04 / sqrt(2 ** precision), mergeable by register maximum """
+
+    def __init__(self, error=0.01):
+        self.precision = min(max(math.ceil(math.log2((1.04 / error) ** 2)), 4), 18)
+        self.registers = np.zeros(2 ** self.precision, dtype=np.uint8)
+
+    def add(self, values:list):
+        if len(values) == 0:
+            return
+        # numbers hashed as float objects : 84 of an int chunk and 84.0 of a float chunk are the same value
+        # (as for the exact value counts), hash_array would hash them as '84' and '84.0'
+        values = np.array(values, dtype=object)
+        inferred_type = pd.api.types.infer_dtype(values, skipna=True)
+        if inferred_type in ('integer', 'floating', 'mixed-integer-float'):
+            values = values.astype('float64').astype(object)
+        elif inferred_type.startswith('mixed'):
+            values = np.array([float(value) if isinstance(value, numbers.Number) and not isinstance(value, bool) else value
+                               for value in values], dtype=object)
+        hashes = pd.util.hash_array(values)
+        indexes = (hashes >> np.uint64(64 - self.precision)).astype(np.int64)
+        # rank = position of the first 1 bit after the index bits (a guard bit bounds it)
+        remaining_bits = (hashes << np.uint64(self.precision)) | np.uint64(1 << (self.precision - 1))
+        ranks = np.ones(len(hashes), dtype=np.uint8)
+        for shift in (32, 16, 8, 4, 2, 1):
+            leading_zeros = remaining_bits < np.uint64(1 << (64 - shift))
+            ranks[leading_zeros] = ranks[leading_zeros] + shift
+            remaining_bits = np.where(leading_zeros, remaining_bits << np.uint64(shift), remaining_bits)
+        np.maximum.at(self.registers, indexes, ranks)
+
+    def merge(self, other):
+        self.registers = np.maximum(self.registers, other.registers)
+        return self
+
+    def estimate(self):
+        registers_amount = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / registers_amount)
+        estimate = alpha * registers_amount ** 2 / np.sum(2.0 ** -self.registers.astype(np.float64))
+        empty_registers = int(np.sum(self.registers == 0))
+        if estimate <= 2.5 * registers_amount and empty_registers > 0:
+            # small cardinalities : linear counting
+            estimate = registers_amount * math.log(registers_amount / empty_registers)
+        return estimate
+
+
+class HeavyHitters:
+    """ Misra-Gries frequent values summary : every value more frequent than error * rows is kept,
+    its count is underestimated by at most error * rows, counts are exact while there are
+    less distinct values than counters ; mergeable (Agarwal et al.) """
+
+    def __init__(self, error=0.001):
+        self.capacity = max(math.ceil(1 / error), 11)
+        self.counters = {}
+
+    def add_counts(self, value_counts:dict):
+        """ batched update with the value -> rows counts of a chunk """
+        for value, count in value_counts.items():
+            self.counters[value] = self.counters.get(value, 0) + count
+        if len(self.counters) > self.capacity:
+            counts = np.fromiter(self.counters.values(), dtype=np.int64, count=len(self.counters))
+            # every counter is decremented by the (capacity + 1)th largest count, the non positive ones are dropped
+            threshold = -np.partition(-counts, self.capacity)[self.capacity]
+            self.counters = {value: count - threshold for value, count in self.counters.items() if count > threshold}
+
+    def merge(self, other):
+        self.add_counts(other.counters)
+        return self
+
+    def top(self):
+        """ most frequent value and its (under estimated) count """
+        if not self.counters:
+            return np.nan, np.nan
+        value_counts = pd.Series(self.counters, dtype='int64').sort_values(ascending=False)
+        return value_counts.index[0], value_counts.iloc[0]
+
+
+class TDigest:
+    """ mergeable quantile sketch (Dunning's merging t-digest with the k1 scale function),
+    compression bounds the amount of centroids (about compression / 2) """
+
+    def __init__(self, compression=200):
+        self.compression = compression
+        self.means = np.empty(0)
+        self.weights = np.empty(0)
+        self.min = np.nan
+        self.max = np.nan
+
+    def add(self, values:np.ndarray):
+        if len(values) == 0:
+            return
+        self.min = np.nanmin([self.min, values.min()])
+        self.max = np.nanmax([self.max, values.max()])
+        self._compress(np.concatenate([self.means, values]), np.concatenate([self.weights, np.ones(len(values))]))
+
+    def merge(self, other):
+        if len(other.means) > 0:
+            self.min = np.nanmin([self.min, other.min])
+            self.max = np.nanmax([self.max, other.max])
+            self._compress(np.concatenate([self.means, other.means]), np.concatenate([self.weights, other.weights]))
+        return self
+
+    def _compress(self, means:np.ndarray, weights:np.ndarray):
+        order = np.argsort(means, kind='stable')
+        means = means[order]
+        weights = weights[order]
+        total = weights.sum()
+        # centroids gather the points falling in the same unit of the k1 scale k(q) = compression / 2pi * asin(2q - 1)
+        middle_quantiles = (np.cumsum(weights) - weights / 2) / total
+        k_scale = np.floor(self.compression / (2 * np.pi) * np.arcsin(2 * middle_quantiles - 1))
+        starts = np.flatnonzero(np.concatenate([[True], k_scale[1:] != k_scale[:-1]]))
+        self.weights = np.add.reduceat(weights, starts)
+        self.means = np.add.reduceat(means * weights, starts) / self.weights
+
+    def quantile(self, q:float):
+        if len(self.means) == 0:
+            return np.nan
+        centers = np.cumsum(self.weights) - self.weights / 2
+        positions = np.concatenate([[0], centers, [self.weights.sum()]])
+        values = np.concatenate([[self.min], self.means, [self.max]])
+        return float(np.interp(q * self.weights.sum(), positions, values))
+
+
+def _is_nan(value):
+    return isinstance(value, float) and math.isnan(value)
+
+
+class ColumnAccumulator:
+    """ mergeable profile of a column fed chunk by chunk (nulls, numeric moments and quantiles,
+    distinct values, whitespace and regex examples), its memory is bounded by max_distinct and not by the amount of rows
+    the distinct values are counted exactly up to max_distinct, then (or from the start in approximate mode)
+    by sketches : HyperLogLog for the distinct count and Misra-Gries for the most frequent values
+    merge() expects the rows of the other accumulator to come after its own rows """
+
+    def __init__(self, name:str, max_distinct=100000, approximate=False, distinct_error=0.01, frequency_error=0.001, quantile_compression=200):
+        self.name = name
+        self.max_distinct = max_distinct
+        self.distinct_error = distinct_error
+        self.frequency_error = frequency_error
+        self.rows = 0
+        self.nulls = 0
+        # numeric moments and quantiles, the column stops being numeric as soon as a chunk isn't
+        self.numeric = True
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = np.nan
+        self.max = np.nan
+        self.quantiles = TDigest(quantile_compression)
+        # distinct value -> amount of rows (np.nan for the nulls) in order of first appearance, or its sketches
+        # the first 11 distinct values are always kept (all of them for binary / ordinal columns)
+        self.value_counts = {}
+        self.samples = []
+        self.sketched = False
+        self.distinct_sketch = None
+        self.heavy_hitters = None
+        if approximate:
+            self._start_sketches()
+        # first example found by the whitespace and regex checks (None while there is none)
+        self.checked_values = False
+        self.checked_trimmed_values = False
+        self.leading_whitespace_example = None
+        self.regex_no_match_examples = dict.fromkeys(name for name, _, _ in PROFILING_REGEXES)
+
+    def __setstate__(self, state):
+        """ unpickled nulls are new float objects : they are mapped back to np.nan, the nulls key of value_counts and samples """
+        state['value_counts'] = {np.nan if _is_nan(value) else value: count for value, count in state['value_counts'].items()}
+        state['samples'] = [np.nan if _is_nan(value) else value for value in state['samples']]
+        self.__dict__.update(state)
+
+    def update(self, column:pd.Series):
+        """ folds the rows of a chunk of the column """
+        column_encoding = encode_column(column)
+        null_uniques = pd.isna(column_encoding['uniques'])
+        self.rows = self.rows + len(column)
+        self.nulls = self.nulls + int(column_encoding['counts'][null_uniques].sum())
+
+        if self.numeric and pd.api.types.is_numeric_dtype(column) and not pd.api.types.is_bool_dtype(column):
+            values = column.dropna().to_numpy(dtype='float64')
+            if len(values) > 0:
+                mean = values.mean()
+                self._merge_moments(len(values), mean, ((values - mean) ** 2).sum(), values.min(), values.max())
+                self.quantiles.add(values)
+        else:
+            self.numeric = False
+
+        chunk_counts = {}
+        for value, count, is_null in zip(column_encoding['uniques'].values.tolist(), column_encoding['counts'].tolist(), null_uniques):
+            chunk_counts[np.nan if is_null else value] = count
+        self._merge_value_counts(chunk_counts)
+
+        # whitespace and regex checks of the chunk distinct values, only for the checks without example yet
+        values = _not_null_uniques(column_encoding)
+        self.checked_values = self.checked_values or len(values) > 0
+        if self.leading_whitespace_example is None:
+            self.leading_whitespace_example = _regex_scan(values, {'leading': r'^\s+'}, looking_for_match=True)['leading']
+
+        remaining_regexes = {name: regex_pattern for name, _, regex_pattern in PROFILING_REGEXES if self.regex_no_match_examples[name] is None}
+        if remaining_regexes:
+            trimmed_values = _not_null_uniques(trim_column_encoding(column_encoding))
+            self.checked_trimmed_values = self.checked_trimmed_values or len(trimmed_values) > 0
+            self.regex_no_match_examples.update(_regex_scan(trimmed_values, remaining_regexes, looking_for_match=False))
+
+    def merge(self, other):
+        """ folds another accumulator of the same column, whose rows come after these ones """
+        self.rows = self.rows + other.rows
+        self.nulls = self.nulls + other.nulls
+        self.numeric = self.numeric and other.numeric
+        if other.count > 0:
+            self._merge_moments(other.count, other.mean, other.m2, other.min, other.max)
+            self.quantiles.merge(other.quantiles)
+
+        if other.sketched:
+            if not self.sketched:
+                self._start_sketches()
+            self._add_samples(other.samples)
+            self.distinct_sketch.merge(other.distinct_sketch)
+            self.heavy_hitters.merge(other.heavy_hitters)
+        else:
+            self._merge_value_counts(other.value_counts)
+
+        self.checked_values = self.checked_values or other.checked_values
+        self.checked_trimmed_values = self.checked_trimmed_values or other.checked_trimmed_values
+        if self.leading_whitespace_example is None:
+            self.leading_whitespace_example = other.leading_whitespace_example
+        for name, no_match_example in other.regex_no_match_examples.items():
+            if self.regex_no_match_examples[name] is None:
+                self.regex_no_match_examples[name] = no_match_example
+        return self
+
+    def _merge_moments(self, count:int, mean:float, m2:float, minimum:float, maximum:float):
+        """ parallel (Chan et al.) update of the count, mean and sum of squared deviations """
+        total = self.count + count
+        delta = mean - self.mean
+        self.mean = self.mean + delta * count / total
+        self.m2 = self.m2 + m2 + delta ** 2 * self.count * count / total
+        self.count = total
+        self.min = np.nanmin([self.min, minimum])
+        self.max = np.nanmax([self.max, maximum])
+
+    def _add_samples(self, values):
+        for value in values:
+            if len(self.samples) > 10:
+                break
+            if value not in self.samples:
+                self.samples.append(value)
+
+    def _start_sketches(self):
+        """ replaces the exact value counts by their sketches """
+        self.sketched = True
+        self.distinct_sketch = HyperLogLog(self.distinct_error)
+        self.heavy_hitters = HeavyHitters(self.frequency_error)
+        self.value_counts.pop(np.nan, None)
+        self.distinct_sketch.add(list(self.value_counts))
+        self.heavy_hitters.add_counts(self.value_counts)
+        self.value_counts = {}
+
+    def _merge_value_counts(self, value_counts:dict):
+        """ adds the value counts (np.nan for the nulls) of rows coming after the current ones """
+        self._add_samples(value_counts)
+        if not self.sketched:
+            for value, count in value_counts.items():
+                self.value_counts[value] = self.value_counts.get(value, 0) + count
+            if len(self.value_counts) > self.max_distinct:
+                self._start_sketches()
+        else:
+            not_null_counts = {value: count for value, count in value_counts.items() if value is not np.nan}
+            self.distinct_sketch.add(list(not_null_counts))
+            self.heavy_hitters.add_counts(not_null_counts)
+
+    def _all_distinct_values_sampled(self):
+        return not self.sketched or len(self.samples) <= 10
+
+    def distinct_amount(self):
+        """ amount of not null distinct values, estimated once sketched unless they are all sampled """
+        if not self.sketched:
+            return len(self.value_counts) - (np.nan in self.value_counts)
+        if self._all_distinct_values_sampled():
+            return len(self.samples) - (np.nan in self.samples)
+        return round(self.distinct_sketch.estimate())
+
+    def null_analysis(self):
+        null_percentage = round((self.nulls/self.rows)*100,2) if self.rows > 0 else np.nan
+        return {'name': self.name, 'len':self.rows, 'nulls': self.nulls, 'null_%':null_percentage}
+
+    def numeric_describe(self):
+        """ df.describe() stats, the quantiles are t-digest estimates """
+        std = np.sqrt(self.m2 / (self.count - 1)) if self.count > 1 else np.nan
+        mean = self.mean if self.count > 0 else np.nan
+        quantiles = [self.quantiles.quantile(q) for q in (0.25, 0.5, 0.75)]
+        return pd.Series([self.count, mean, std, self.min] + quantiles + [self.max],
+                         index=['count', 'mean', 'std', 'min', '25%', '50%', '75%', 'max'], dtype='float64', name=self.name)
+
+    def non_numeric_describe(self):
+        """ count, unique, top, freq as in df.describe(), estimated by the sketches once sketched """
+        if self.sketched:
+            top, freq = self.heavy_hitters.top()
+            return [self.rows - self.nulls, self.distinct_amount(), top, freq]
+        value_counts = pd.Series({value: count for value, count in self.value_counts.items() if value is not np.nan}, dtype='int64')
+        value_counts = value_counts.sort_values(ascending=False)
+        if len(value_counts) == 0:
+            return [0, 0, np.nan, np.nan]
+        return [value_counts.sum(), len(value_counts), value_counts.index[0], value_counts.iloc[0]]
+
+    def values_analysis(self):
+        if not self.sketched:
+            return _values_analysis(self.name, list(self.value_counts))
+        # the samples hold every distinct value unless there are more than 10 of them
+        return _values_analysis(self.name, self.samples)
+
+    def column_encoding(self):
+        """ uniques and counts (no row codes) of the distinct values, None if they aren't all known """
+        if not self.sketched:
+            value_counts = self.value_counts
+        elif self._all_distinct_values_sampled():
+            # less distinct values than heavy hitters counters : their counts are exact
+            value_counts = {value: self.nulls if value is np.nan else self.heavy_hitters.counters[value] for value in self.samples}
+        else:
+            return None
+        return {'uniques': pd.Index(list(value_counts), dtype='object'),
+                'counts': np.array(list(value_counts.values()), dtype='int64')}
+
+    def whitespace_analysis(self):
+        if not self.checked_values:
+            example = '[Empty col]'
+        elif self.leading_whitespace_example is None:
+            example = '[No match]'
+        else:
+            example = self.leading_whitespace_example
+        return {'name': self.name,
+                'has_leading_spaces_regex_example':example,
+                'has_trailing_spaces_regex_example':"regex_not_working_yet"}
+
+    def regex_analysis(self):
+        regex_analysis = {'name': self.name}
+        for name, no_match_column, _ in PROFILING_REGEXES:
+            no_match_example = self.regex_no_match_examples[name]
+            regex_analysis[name] = no_match_example is None
+            if not self.checked_trimmed_values:
+                regex_analysis[no_match_column] = '[Empty col]'
+            elif no_match_example is None:
+                regex_analysis[no_match_column] = '[No no-match]'
+            else:
+                regex_analysis[no_match_column] = no_match_example
+        return regex_analysis
+
+
+def _csv_text_columns(csv:str, separateur=";", encodage='utf-8', nrows=100000):
+    """ text columns of the first nrows rows (see infer_csv_schema), to be read as text in every chunk
+    (else the chunks where a code column only holds digits would turn its codes into numbers) """
+    schema = infer_csv_schema(csv, separateur, encodage, nrows)
+    return {column: str for column, column_type in schema.items() if column_type in ('string', 'category')}
+
+
+def _fold_csv_chunks(chunks, accumulators:dict, new_accumulator, profiled_columns=None, digests=None, first_row=0, appended_key_hashes=None):
+    """ folds the csv chunks into the column accumulators (only the profiled_columns when given),
+    created by new_accumulator(column) for the columns without one
+    digests : column digests extended with the chunks rows, numbered from first_row (see _column_digest)
+    appended_key_hashes : {key : list} receiving the hashes of the key values of each chunk (see _key_hashes)
+    returns the amount of rows and the first 10 rows folded """
+    rows_amount = 0
+    head = None
+    for chunk in tqdm(chunks, desc='chunks', disable=VERBOSITY < 1):
+        if head is None:
+            head = chunk.head(10)
+        for column in chunk:
+            if profiled_columns is None or column in profiled_columns:
+                if column not in accumulators:
+                    accumulators[column] = new_accumulator(column)
+                accumulators[column].update(chunk[column])
+            if digests is not None:
+                digests[column] = (digests.get(column, 0) + _column_digest(chunk[column], first_row + rows_amount)) % 2**64
+        if appended_key_hashes is not None:
+            for key, key_hashes in appended_key_hashes.items():
+                key_hashes.append(_key_hashes(chunk, key))
+        rows_amount = rows_amount + len(chunk)
+    return rows_amount, head
+
+
+def _accumulators_report(report:HtmlReport, accumulators:dict, head:pd.DataFrame, rows_amount:int, styles:list):
+    """ writes the sections of the profile_dataset report built from column accumulators (all but the business keys) """
+    columns = list(accumulators)
+    report.write(shape_section(columns, rows_amount))
+
+    if head is not None:
+        report.write(head_section(head, styles))
+
+    # Missing value analysis
+    result = pd.DataFrame([accumulator.null_analysis() for accumulator in accumulators.values()])
+    report.write(null_section(result, styles))
+
+    # describe() numeric and non numeric cols
+    numeric_columns = [column for column in columns if accumulators[column].numeric]
+    if numeric_columns:
+        describe = pd.concat([accumulators[column].numeric_describe() for column in numeric_columns], axis=1)
+        report.write(numeric_describe_section(describe, styles))
+    non_numeric_columns = [column for column in columns if not accumulators[column].numeric]
+    if non_numeric_columns:
+        describe = pd.DataFrame({column: accumulators[column].non_numeric_describe() for column in non_numeric_columns},
+                                index=['count', 'unique', 'top', 'freq'], dtype='object')
+        report.write(non_numeric_describe_section(describe, styles))
+
+    # Values profiling
+    result = pd.DataFrame([accumulator.values_analysis() for accumulator in accumulators.values()])
+    report.write(values_section(result, styles))
+    encoding = {column: accumulator.column_encoding() for column, accumulator in accumulators.items()}
+    report.write_chart(pie_charting_ordinal_and_binary_values(None, result, encoding, include_plotlyjs=False))
+
+    # Whitespace analysis and regex matcher
+    result = pd.DataFrame([accumulator.whitespace_analysis() for accumulator in accumulators.values()])
+    report.write(whitespace_section(result, styles))
+    result = pd.DataFrame([accumulator.regex_analysis() for accumulator in accumulators.values()])
+    report.write(regex_section(result, styles))
+
+
+def profile_csv_by_chunks(csv:str, output_html_file:str, separateur=";", encodage='utf-8', chunksize=100000, max_distinct=100000,
+                          approximate=False, distinct_error=0.01, frequency_error=0.001, quantile_compression=200):
+    """ Dataprofiling pipeline for csv files larger than the memory : the file is read by chunks of chunksize rows
+    folded into column accumulators, the peak memory depends on chunksize and max_distinct, not on the file size
+    approximate : distinct counts and top values estimated by sketches from the start (see ColumnAccumulator)
+    with distinct_error (HyperLogLog relative error) and frequency_error (Misra-Gries error as a share of the rows)
+    the same html sections are written (quantiles are t-digest estimates), except for the business keys
+    which need the whole dataset
+    returns the column accumulators """
+    styles = table_styles()
+
+    def new_accumulator(column):
+        return ColumnAccumulator(column, max_distinct, approximate, distinct_error, frequency_error, quantile_compression)
+
+    text_columns = _csv_text_columns(csv, separateur, encodage, chunksize)
+    chunks = pd.read_csv(csv, sep=separateur, encoding=encodage, chunksize=chunksize, dtype=text_columns)
+    accumulators = {}
+    rows_amount, head = _fold_csv_chunks(chunks, accumulators, new_accumulator)
+
+    with HtmlReport(output_html_file) as report:
+        _accumulators_report(report, accumulators, head, rows_amount, styles)
+        report.write('<BR>Recherche des clefs métier : not run when profiling by chunks (needs the whole dataset)<BR>')
+    return accumulators
+
+
+PROFILE_CACHE_VERSION = 4
+
+
+def file_fingerprint(path:str, previous_size=None, block_size=1048576):
+    """ size and sha256 of a file, streamed by blocks,
+    with the sha256 of its first previous_size bytes ('prefix_sha256') when previous_size is given, in the same read """
+    content_hash = hashlib.sha256()
+    prefix_hash = None
+    read_size = 0
+    last_block = b''
+    with open(path, 'rb') as file:
+        for block in iter(lambda: file.read(block_size), b''):
+            if previous_size is not None and prefix_hash is None and read_size + len(block) >= previous_size:
+                prefix_hash = content_hash.copy()
+                prefix_hash.update(block[:previous_size - read_size])
+            content_hash.update(block)
+            read_size = read_size + len(block)
+            last_block = block
+    if previous_size == 0:
+        prefix_hash = hashlib.sha256()
+    fingerprint = {'size': read_size,
+                   'sha256': content_hash.hexdigest(),
+                   'ends_with_newline': last_block.endswith(b'\n')}
+    if previous_size is not None:
+        fingerprint['prefix_sha256'] = None if prefix_hash is None else prefix_hash.hexdigest()
+    return fingerprint
+
+
+def _is_appended(fingerprint:dict, previous_fingerprint:dict):
+    """ True when the file (fingerprinted with previous_size = the previous file size) still holds the whole previous file,
+    byte for byte, with maybe lines appended after it """
+    previous_size = previous_fingerprint['size']
+    if fingerprint['size'] < previous_size or (fingerprint['size'] > previous_size and not previous_fingerprint['ends_with_newline']):
+        return False
+    return fingerprint.get('prefix_sha256') == previous_fingerprint['sha256']
+
+
+def _hashable_values(values):
+    """ numbers hashed as floats, so a column read as int in a chunk and as float in another hashes the same """
+    if pd.api.types.is_numeric_dtype(values) and not pd.api.types.is_bool_dtype(values):
+        return values.astype('float64')
+    return values
+
+
+def _column_digest(column:pd.Series, first_row:int):
+    """ digest of the values of a column and of their row numbers (starting at first_row) :
+    the digest of a column is the sum (modulo 2**64) of the digests of its chunks, so it can be extended with appended rows """
+    value_hashes = pd.util.hash_pandas_object(_hashable_values(column), index=False).to_numpy()
+    row_hashes = pd.util.hash_array(np.arange(first_row, first_row + len(column), dtype=np.int64))
+    return int(np.bitwise_xor(value_hashes, row_hashes).sum(dtype=np.uint64))
+
+
+def _key_hashes(df:pd.DataFrame, key:tuple):
+    """ hash of the values of the key columns of every row """
+    return pd.util.hash_pandas_object(df[list(key)].apply(_hashable_values), index=False).to_numpy()
+
+
+def default_profile_cache_file(csv:str):
+    """ profile cache of a csv in the user's private cache directory ($XDG_CACHE_HOME/hercules or ~/.cache/hercules, created
+    readable by its owner only), named after the csv absolute path """
+    cache_dir = os.path.join(os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache'), 'hercules')
+    os.makedirs(cache_dir, mode=0o700, exist_ok=True)
+    csv_path = os.path.abspath(csv)
+    return os.path.join(cache_dir, os.path.basename(csv_path) + '_' + hashlib.sha256(csv_path.encode('utf-8')).hexdigest()[:16] + '.profile_cache')
+
+
+def _is_private(file) -> bool:
+    """ True when the opened file belongs to the current user and nobody else can write it (always True on windows) """
+    if not hasattr(os, 'getuid'):
+        return True
+    status = os.fstat(file.fileno())
+    return status.st_uid == os.getuid() and not status.st_mode & 0o022
+
+
+def load_profile_cache(cache_file:str):
+    """ profile cache saved by save_profile_cache, None if there is none or it can't be used
+    the cache is a pickle : it is only loaded when it belongs to the current user and nobody else can write it """
+    if not os.path.exists(cache_file):
+        return None
+    try:
+        with open(cache_file, 'rb') as file:
+            if not _is_private(file):
+                _log(f"\nProfile cache {cache_file} ignored : it doesn't belong to the current user or others can write it, full profiling")
+                return None
+            cache = pickle.load(file)
+    except Exception as error:
+        # unreadable, truncated, or written by other pandas / numpy versions (ModuleNotFoundError, TypeError, ValueError...)
+        _log(f"\nProfile cache {cache_file} can't be read ({type(error).__name__} : {error}) : full profiling")
+        return None
+    if not isinstance(cache, dict) or cache.get('version') != PROFILE_CACHE_VERSION:
+        return None
+    return cache
+
+
+def save_profile_cache(cache_file:str, cache:dict):
+    """ pickles the profile cache, readable and writable by its owner only,
+    replacing the previous one only once it is fully written """
+    temporary_file = cache_file + '.tmp'
+    if os.path.exists(temporary_file):
+        os.remove(temporary_file)
+    with os.fdopen(os.open(temporary_file, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600), 'wb') as file:
+        pickle.dump(cache, file, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(temporary_file, cache_file)
+
+
+def _csv_keys(csv:str, max_key_length:int, text_columns:dict, separateur=";", encodage='utf-8', workers=None):
+    """ business_key_profiling of the whole csv, with the nullable columns and the sorted hashes of the values of each key
+    the whole csv is loaded in memory : unlike the chunked profiling, its memory grows with the file size """
+    df = pd.read_csv(csv, sep=separateur, encoding=encodage, dtype=text_columns)
+    result = business_key_profiling(df, max_key_length, workers=workers)
+    key_hashes = {}
+    if len(result) > 0:
+        for key in result.loc[result['is_key'] == True, 'key']:
+            key = tuple(ast.literal_eval(key))
+            key_hashes[key] = np.sort(_key_hashes(df, key))
+    return {'max_key_length': max_key_length,
+            'nullable': df.columns[df.isna().any()].tolist(),
+            'result': result,
+            'key_hashes': key_hashes}
+
+
+def _appended_keys(keys:dict, nullable:list, appended_key_hashes:dict):
+    """ the cached keys once rows are appended, None if a key broke or a column became nullable (the search has to be run again)
+    the non keys stay non keys : their duplicates, nulls and subkeys are still there """
+    if nullable != keys['nullable']:
+        return None
+    key_hashes = {}
+    for key, previous_hashes in keys['key_hashes'].items():
+        new_hashes = np.concatenate(appended_key_hashes[key]) if appended_key_hashes[key] else np.array([], dtype=np.uint64)
+        if len(np.unique(new_hashes)) < len(new_hashes) or np.isin(new_hashes, previous_hashes).any():
+            _log(f"\n{list(key)} is not a key anymore : business keys search on the whole file")
+            return None
+        key_hashes[key] = np.sort(np.concatenate([previous_hashes, new_hashes]))
+    return dict(keys, key_hashes=key_hashes)
+
+
+def profile_csv_incremental(csv:str, output_html_file:str, cache_file=None, separateur=";", encodage='utf-8', chunksize=100000,
+                            max_key_length=None, workers=None, max_distinct=100000, approximate=False, distinct_error=0.01,
+                            frequency_error=0.001, quantile_compression=200):
+    """ profile_csv_by_chunks keeping its column accumulators, column digests, business keys and non keys
+    in cache_file (see default_profile_cache_file, only a cache file private to the user is loaded) so the next runs only profile what changed :
+    - same file (same sha256) : the report is built from the cache
+    - rows appended (the file starts with the whole cached one, byte for byte, see file_fingerprint) : only the new rows are read and folded,
+      the cached keys are checked on the hashes of the new key values and the search runs again on the whole file
+      only if a key broke or a column became nullable
+    - any other change : the columns whose values digest didn't change keep their cached accumulator,
+      the others only are profiled again
+    max_key_length : business keys search up to this length, on the whole file loaded in memory (see _csv_keys),
+    skipped when None so the memory stays bounded by chunksize and max_distinct
+    returns the column accumulators """
+    styles = table_styles()
+    if cache_file is None:
+        cache_file = default_profile_cache_file(csv)
+    settings = {'separateur': separateur, 'encodage': encodage, 'max_distinct': max_distinct, 'approximate': approximate,
+                'distinct_error': distinct_error, 'frequency_error': frequency_error, 'quantile_compression': quantile_compression}
+
+    def new_accumulator(column):
+        return ColumnAccumulator(column, max_distinct, approximate, distinct_error, frequency_error, quantile_compression)
+
+    cache = load_profile_cache(cache_file)
+    if cache is not None and cache['settings'] != settings:
+        cache = None
+    fingerprint = file_fingerprint(csv, None if cache is None else cache['fingerprint']['size'])
+
+    if cache is not None and _is_appended(fingerprint, cache['fingerprint']):
+        appended_rows = 0
+        appended_key_hashes = None
+        if cache['keys'] is not None:
+            appended_key_hashes = {key: [] for key in cache['keys']['key_hashes']}
+        if fingerprint['size'] > cache['fingerprint']['size']:
+            with open(csv, 'rb') as csv_file:
+                csv_file.seek(cache['fingerprint']['size'])
+                chunks = pd.read_csv(csv_file, sep=separateur, encoding=encodage, chunksize=chunksize, header=None,
+                                     names=list(cache['accumulators']), dtype=cache['text_columns'])
+                appended_rows, _ = _fold_csv_chunks(chunks, cache['accumulators'], new_accumulator, digests=cache['digests'],
+                                                    first_row=cache['rows'], appended_key_hashes=appended_key_hashes)
+        _log(f"\nProfile cache : {appended_rows} lignes appended to the {cache['rows']} cached ones")
+        cache['rows'] = cache['rows'] + appended_rows
+        if cache['keys'] is not None and appended_rows > 0:
+            nullable = [column for column, accumulator in cache['accumulators'].items() if accumulator.nulls > 0]
+            cache['keys'] = _appended_keys(cache['keys'], nullable, appended_key_hashes)
+    else:
+        # full read : every column digest, only the columns without an up to date cached accumulator are profiled again
+        text_columns = _csv_text_columns(csv, separateur, encodage, chunksize)
+        chunks = pd.read_csv(csv, sep=separateur, encoding=encodage, chunksize=chunksize, dtype=text_columns)
+        digests = {}
+        if cache is None:
+            accumulators = {}
+            rows_amount, head = _fold_csv_chunks(chunks, accumulators, new_accumulator, digests=digests)
+            changed_columns = list(accumulators)
+        else:
+            rows_amount, head = _fold_csv_chunks(chunks, {}, new_accumulator, profiled_columns=[], digests=digests)
+            changed_columns = [column for column in digests if rows_amount != cache['rows'] or cache['digests'].get(column) != digests[column]]
+            accumulators = {column: cache['accumulators'][column] for column in digests if column not in changed_columns}
+            _log(f"\nProfile cache : {len(changed_columns)} changed columns out of {len(digests)}")
+            if changed_columns:
+                chunks = pd.read_csv(csv, sep=separateur, encoding=encodage, chunksize=chunksize, dtype=text_columns, usecols=changed_columns)
+                _fold_csv_chunks(chunks, accumulators, new_accumulator)
+            accumulators = {column: accumulators[column] for column in digests}
+        keys = None if cache is None or changed_columns else cache['keys']
+        cache = {'version': PROFILE_CACHE_VERSION, 'settings': settings, 'text_columns': text_columns,
+                 'accumulators': accumulators, 'digests': digests, 'rows': rows_amount, 'head': head,
+                 'keys': keys}
+    cache['fingerprint'] = {key: value for key, value in fingerprint.items() if key != 'prefix_sha256'}
+
+    # keys : searched again when the data changed in a way the cached keys can't follow or for another max_key_length
+    if max_key_length is not None and (cache['keys'] is None or cache['keys']['max_key_length'] != max_key_length):
+        cache['keys'] = _csv_keys(csv, max_key_length, cache['text_columns'], separateur, encodage, workers)
+
+    save_profile_cache(cache_file, cache)
+
+    with HtmlReport(output_html_file) as report:
+        _accumulators_report(report, cache['accumulators'], cache['head'], cache['rows'], styles)
+        if max_key_length is not None:
+            report.write(keys_section(cache['keys']['result'], max_key_length, styles))
+        else:
+            report.write('<BR>Recherche des clefs métier : not run (max_key_length is None)<BR>')
+    return cache['accumulators']
+
+
 try:
     if __name__ == "__main__":
         main()
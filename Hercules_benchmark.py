@@ -0,0 +1,217 @@
+#! /usr/bin/env python3
+# coding: utf-8
+
+""" Benchmarks of the Hercules profiling stages on synthetic tables by PuffInc https://github.com/puffinc
+free use and reuse as long as you state Puffinc as th original author
+
+python Hercules_benchmark.py --rows 10000 100000 1000000 --output results.json --baseline baseline.json """
+
+import argparse
+import gc
+import json
+import math
+import platform
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+import Hercules as H
+
+
+def generate_dataset(rows=10000, columns=10, cardinality=100, null_rate=0.05, whitespace_rate=0.01, key_columns=2, seed=0):
+    """ synthetic table for the benchmarks :
+    key_columns integer columns whose combination is the only key (each one alone has duplicates as soon as key_columns > 1),
+    then columns cycling through text codes (cardinality distinct values, whitespace_rate of them with a leading space),
+    integers (cardinality distinct values), floats and ordinal letters, each with null_rate nulls """
+    rng = np.random.default_rng(seed)
+    data = {}
+
+    # composite key : the digits of the row number in base key_base, rows shuffled
+    key_base = max(2, math.ceil(rows ** (1 / key_columns))) if key_columns > 0 else 1
+    row_numbers = rng.permutation(rows)
+    for position in range(key_columns):
+        data['key_' + str(position)] = (row_numbers // key_base ** position) % key_base
+
+    codes = np.array(['C' + str(value).zfill(6) for value in range(cardinality)], dtype=object)
+    spaced = rng.random(cardinality) < whitespace_rate
+    codes[spaced] = ' ' + codes[spaced]
+    letters = np.array(list('ABCDE'), dtype=object)
+    for position in range(max(columns - key_columns, 0)):
+        kind = ['code', 'integer', 'float', 'ordinal'][position % 4]
+        name = kind + '_' + str(position)
+        nulls = rng.random(rows) < null_rate
+        if kind == 'code':
+            column = codes[rng.integers(0, cardinality, rows)]
+            column[nulls] = None
+        elif kind == 'integer':
+            column = rng.integers(0, cardinality, rows).astype('float64' if nulls.any() else 'int64')
+            column[nulls] = np.nan
+        elif kind == 'float':
+            column = rng.normal(size=rows)
+            column[nulls] = np.nan
+        else:
+            column = letters[rng.integers(0, len(letters), rows)]
+            column[nulls] = None
+        data[name] = column
+
+    return pd.DataFrame(data)
+
+
+def profiling_stages(max_key_length=3, max_lhs_length=2):
+    """ benchmarked stages in the profile_dataset order : (name, function(df, state)),
+    state holds what a stage computes for the next ones (encoding, values analysis) """
+
+    def encoding(df, state):
+        state['encoding'] = H.encode_dataset(df)
+
+    def nulls(df, state):
+        H.null_profiling(df, state['encoding'])
+
+    def describe(df, state):
+        df.describe(include='number')
+        H.non_numeric_describe(df, state['encoding'])
+
+    def values(df, state):
+        state['values'] = H.values_profiling(df, state['encoding'])
+
+    def pie_charts(df, state):
+        H.pie_charting_ordinal_and_binary_values(df, state['values'], state['encoding'], include_plotlyjs=False)
+
+    def whitespace(df, state):
+        H.whitespace_profiling(df, state['encoding'])
+
+    def regex(df, state):
+        # as the 'trim + regex' stage of profile_dataset : the regexes run on the trimmed distinct values
+        H.regex_profiling(df, H.trim_encoding(state['encoding']))
+
+    def keys(df, state):
+        H.business_key_profiling(df, max_key_length, state['encoding'])
+
+    def dependencies(df, state):
+        H.functional_dependency_profiling(df, max_lhs_length, 0.0, state['encoding'])
+
+    def correlation(df, state):
+        H.correlation_analysis(df, state['values'], state['encoding'])
+
+    return [('encoding', encoding), ('nulls', nulls), ('describe', describe), ('values', values), ('pie_charts', pie_charts),
+            ('whitespace', whitespace), ('regex', regex), ('keys', keys), ('dependencies', dependencies), ('correlation', correlation)]
+
+
+def measure(stage, df:pd.DataFrame, state:dict, repeat=1, trace_memory=True):
+    """ best wall and cpu time of repeat runs of the stage, then its peak python memory (tracemalloc) in an extra run
+    (tracing slows the run down, so it isn't timed) """
+    wall_times = []
+    cpu_times = []
+    for _ in range(repeat):
+        gc.collect()
+        wall_start, cpu_start = time.perf_counter(), time.process_time()
+        stage(df, state)
+        wall_times.append(time.perf_counter() - wall_start)
+        cpu_times.append(time.process_time() - cpu_start)
+
+    peak_memory = None
+    if trace_memory:
+        gc.collect()
+        tracemalloc.start()
+        stage(df, state)
+        peak_memory = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    return {'seconds': min(wall_times),
+            'cpu_seconds': min(cpu_times),
+            'rows_per_second': len(df) / min(wall_times) if min(wall_times) > 0 else None,
+            'peak_memory_mb': None if peak_memory is None else round(peak_memory / 2**20, 2)}
+
+
+def run_benchmarks(rows_amounts:list, dataset_options:dict, stage_names=None, repeat=1, trace_memory=True,
+                   max_key_length=3, max_lhs_length=2):
+    """ runs every stage (or the stage_names ones, plus the stages they depend on) on a synthetic table of each size """
+    results = []
+    for rows in rows_amounts:
+        df = generate_dataset(rows, **dataset_options)
+        state = {}
+        for name, stage in profiling_stages(max_key_length, max_lhs_length):
+            # encoding and values are computed anyway, the later stages use them
+            if stage_names is not None and name not in stage_names and name not in ('encoding', 'values'):
+                continue
+            measures = measure(stage, df, state, repeat, trace_memory)
+            result = dict({'rows': rows, 'columns': len(df.columns), 'stage': name}, **measures)
+            results.append(result)
+            print(f"{rows:>10} rows  {name:<13} {result['seconds']:>9.3f} s  {result['rows_per_second'] or 0:>13,.0f} rows/s"
+                  + ('' if result['peak_memory_mb'] is None else f"  {result['peak_memory_mb']:>9.1f} MB"))
+    return results
+
+
+def environment():
+    return {'python': platform.python_version(), 'platform': platform.platform(), 'processor': platform.processor(),
+            'pandas': pd.__version__, 'numpy': np.__version__, 'pyarrow': None if H.pa is None else H.pa.__version__}
+
+
+def compare_with_baseline(results:list, baseline:list, tolerance=0.2):
+    """ prints the time ratio of each result to the baseline result of the same rows, columns and stage,
+    returns the results slower than the baseline by more than tolerance (0.2 : 20 % slower) """
+    baseline_seconds = {(result['rows'], result['columns'], result['stage']): result['seconds'] for result in baseline}
+    regressions = []
+    print(f"\n{'rows':>10}  {'stage':<13} {'baseline s':>10} {'current s':>10} {'ratio':>7}")
+    for result in results:
+        previous = baseline_seconds.get((result['rows'], result['columns'], result['stage']))
+        if previous is None or previous <= 0:
+            continue
+        ratio = result['seconds'] / previous
+        regression = ratio > 1 + tolerance
+        if regression:
+            regressions.append(dict(result, baseline_seconds=previous, ratio=ratio))
+        print(f"{result['rows']:>10}  {result['stage']:<13} {previous:>10.3f} {result['seconds']:>10.3f} {ratio:>7.2f}"
+              + ('  <- slower' if regression else ''))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmarks of the Hercules profiling stages on synthetic tables')
+    parser.add_argument('--rows', type=int, nargs='+', default=[10000, 100000, 1000000], help='table sizes (rows)')
+    parser.add_argument('--columns', type=int, default=10)
+    parser.add_argument('--cardinality', type=int, default=100, help='distinct values of the code and integer columns')
+    parser.add_argument('--null-rate', type=float, default=0.05)
+    parser.add_argument('--whitespace-rate', type=float, default=0.01, help='share of the codes with a leading space')
+    parser.add_argument('--key-columns', type=int, default=2, help='columns of the only key of the table')
+    parser.add_argument('--seed', type=int, default=0)
+    stage_names = [name for name, _ in profiling_stages()]
+    parser.add_argument('--stages', nargs='+', choices=stage_names, metavar='STAGE',
+                        help='stages to run (all of them by default) : ' + ', '.join(stage_names))
+    parser.add_argument('--repeat', type=int, default=1, help='runs of each stage, the best time is kept')
+    parser.add_argument('--no-memory', action='store_true', help='skip the peak memory (tracemalloc) runs')
+    parser.add_argument('--max-key-length', type=int, default=3)
+    parser.add_argument('--max-lhs-length', type=int, default=2)
+    parser.add_argument('--output', default='Hercules_benchmark_results.json', help='results file (json)')
+    parser.add_argument('--baseline', help='results file of a previous run to compare with')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='slowdown ratio over the baseline reported as a regression')
+    parser.add_argument('--fail-on-regression', action='store_true', help='exit code 1 when a stage regressed')
+    arguments = parser.parse_args()
+
+    # the profilers console output is kept out of the benchmark output
+    H.VERBOSITY = 0
+    dataset_options = {'columns': arguments.columns, 'cardinality': arguments.cardinality, 'null_rate': arguments.null_rate,
+                       'whitespace_rate': arguments.whitespace_rate, 'key_columns': arguments.key_columns, 'seed': arguments.seed}
+    results = run_benchmarks(arguments.rows, dataset_options, arguments.stages, arguments.repeat, not arguments.no_memory,
+                             arguments.max_key_length, arguments.max_lhs_length)
+
+    with open(arguments.output, 'w') as results_file:
+        json.dump({'environment': environment(),
+                   'parameters': dict(dataset_options, repeat=arguments.repeat, max_key_length=arguments.max_key_length,
+                                      max_lhs_length=arguments.max_lhs_length),
+                   'results': results}, results_file, indent=2)
+    print(f"\nresults written to {arguments.output}")
+
+    if arguments.baseline:
+        with open(arguments.baseline) as baseline_file:
+            baseline = json.load(baseline_file)['results']
+        regressions = compare_with_baseline(results, baseline, arguments.tolerance)
+        if regressions and arguments.fail_on_regression:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
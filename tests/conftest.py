@@ -0,0 +1,39 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# Hercules.py is a script at the root of the repository
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import Hercules
+
+Hercules.VERBOSITY = 0
+
+
+def _random_frame(seed, max_rows=40, max_cardinality=16, null_rate=0.0):
+    """ small random table for the lattice searches : 1 to max_rows rows of 2 to 5 integer columns
+    of 1 to max_cardinality values each, about null_rate of the cells null """
+    rng = np.random.default_rng(seed)
+    rows = int(rng.integers(1, max_rows))
+    df = pd.DataFrame({f'c{position}': rng.integers(0, int(rng.integers(1, max_cardinality)), rows)
+                       for position in range(int(rng.integers(2, 6)))})
+    if null_rate > 0:
+        df = df.mask(rng.random(df.shape) < null_rate)
+    return df
+
+
+@pytest.fixture
+def random_frame():
+    """ random_frame(seed, max_rows, max_cardinality, null_rate) builds a small random table (see _random_frame) """
+    return _random_frame
+
+
+@pytest.fixture
+def mixed_frame():
+    """ 2000 rows : an id, two integer columns, a text column with leading whitespace and nulls and a float column """
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({'id': np.arange(2000), 'a': rng.integers(0, 50, 2000), 'b': rng.integers(0, 40, 2000),
+                         'code': rng.choice(['x', ' y', None], 2000), 'amount': rng.normal(size=2000)})
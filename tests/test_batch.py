@@ -0,0 +1,61 @@
+import sys
+
+import pandas as pd
+import pytest
+
+import Hercules as H
+
+
+def _dataset_dir(tmp_path):
+    data_dir = tmp_path / 'data'
+    data_dir.mkdir()
+    (data_dir / 'a&b.csv').write_text('id;code\n' + ''.join(f'{row};C{row % 3}\n' for row in range(30)))
+    (data_dir / 'other.csv').write_text('id;amount\n1;2.5\n2;\n3;1.5\n')
+    (data_dir / 'notes.md').write_text('not a dataset')
+    return data_dir
+
+
+def test_dataset_files(tmp_path):
+    data_dir = _dataset_dir(tmp_path)
+    expected = [str(data_dir / 'a&b.csv'), str(data_dir / 'other.csv')]
+    assert H.dataset_files([str(data_dir)]) == expected
+    assert H.dataset_files([str(data_dir / '*.csv'), str(data_dir / 'other.csv')]) == expected
+
+
+@pytest.mark.parametrize('mode', ['memory', 'chunks', 'incremental'])
+def test_profile_files_of_a_directory(tmp_path, mode, monkeypatch):
+    monkeypatch.setenv('XDG_CACHE_HOME', str(tmp_path / 'cache'))
+    output_dir = tmp_path / 'reports'
+    summary = H.profile_files(H.dataset_files([str(_dataset_dir(tmp_path))]), str(output_dir), jobs=1,
+                              profile_options={'sections': ['nulls', 'keys']}, mode=mode, chunk_options={'chunksize': 10})
+    assert summary['status'].tolist() == ['ok', 'ok']
+    written = pd.read_csv(output_dir / 'summary.csv')
+    assert written['report'].tolist() == ['a&b.html', 'other.html']
+    assert written['rows'].tolist() == [30, 3] and written['columns'].tolist() == [2, 2]
+    assert written['null_cells_%'].tolist() == [0.0, round(100 / 6, 2)]
+    assert (output_dir / 'a&b.html').exists() and (output_dir / 'other.html').exists()
+    index = (output_dir / 'index.html').read_text()
+    assert '<a href="a%26b.html">a&amp;b.html</a>' in index and '<a href="other.html">other.html</a>' in index
+
+
+def test_main_reports_the_failed_files(tmp_path, monkeypatch):
+    data_dir = _dataset_dir(tmp_path)
+    (data_dir / 'broken.parquet').write_text('not parquet')
+    output_dir = tmp_path / 'reports'
+    monkeypatch.setattr(sys, 'argv', ['Hercules.py', str(data_dir), '--output-dir', str(output_dir), '--jobs', '2',
+                                      '--sections', 'nulls', 'describe'])
+    with pytest.raises(SystemExit) as exit_info:
+        H.main()
+    assert exit_info.value.code == 1
+    summary = pd.read_csv(output_dir / 'summary.csv')
+    assert summary['status'].str.startswith('ok').tolist() == [True, False, True]
+    assert pd.isna(summary.loc[1, 'report'])
+
+
+def test_profile_files_metadata_mode(tmp_path):
+    parquet = tmp_path / 'data.parquet'
+    pd.DataFrame({'id': range(10), 'amount': [None] * 5 + [1.5] * 5}).to_parquet(parquet)
+    summary = H.profile_files([str(parquet)], str(tmp_path / 'reports'), mode='metadata')
+    assert summary.loc[0, 'status'] == 'ok'
+    assert (summary.loc[0, 'rows'], summary.loc[0, 'columns'], summary.loc[0, 'null_cells_%']) == (10, 2, 25.0)
+    assert pd.isna(summary.loc[0, 'slowest_stage'])
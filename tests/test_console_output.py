@@ -0,0 +1,26 @@
+import Hercules as H
+
+
+def test_profiling_prints_nothing_when_verbosity_is_0(tmp_path, capsys, monkeypatch, mixed_frame):
+    monkeypatch.setattr(H, 'VERBOSITY', 0)
+    H.profile_dataset(mixed_frame, str(tmp_path / 'full.html'), sections=['head', 'nulls', 'keys', 'dependencies'])
+    H.profile_dataset(mixed_frame, str(tmp_path / 'sample.html'), sample=100, random_state=0, sections=['nulls', 'keys'])
+    csv = tmp_path / 'data.csv'
+    mixed_frame.to_csv(csv, index=False, sep=';')
+    H.profile_csv_incremental(str(csv), str(tmp_path / 'incremental.html'), cache_file=str(tmp_path / 'cache'), max_key_length=2)
+    with open(csv, 'a') as appended:
+        appended.write('2000;1;2;x;1.5\n')
+    H.profile_csv_incremental(str(csv), str(tmp_path / 'incremental.html'), cache_file=str(tmp_path / 'cache'), max_key_length=2)
+    H.profile_csv_by_chunks(str(csv), str(tmp_path / 'chunks.html'), chunksize=500)
+    captured = capsys.readouterr()
+    # the progress bars of the keys search, the dependencies search and the chunks reader are written to stderr
+    assert captured.out == '' and captured.err == ''
+
+
+def test_profiling_messages_are_printed_at_verbosity_1(tmp_path, capsys, monkeypatch, mixed_frame):
+    monkeypatch.setattr(H, 'VERBOSITY', 1)
+    H.profile_dataset(mixed_frame, str(tmp_path / 'sample.html'), sample=100, random_state=0, sections=['keys'])
+    out = capsys.readouterr().out
+    assert 'df.shape() : 5 colonnes ; 2000 lignes' in out
+    assert 'Nullable columns are' in out
+    assert 'Profiled on a uniform sample of 100 lignes out of 2000' in out
@@ -0,0 +1,39 @@
+from itertools import combinations
+
+import numpy as np
+import pytest
+
+import Hercules as H
+
+
+def _g3_error(df, lhs, rhs):
+    """ rows to remove for lhs -> rhs to hold : the rows out of the most frequent rhs value of their lhs group """
+    if not lhs:
+        return len(df) - (df[rhs].value_counts(dropna=False).max() if len(df) else 0)
+    counts = df.groupby(list(lhs) + [rhs], dropna=False).size()
+    return len(df) - int(counts.groupby(level=list(range(len(lhs))), dropna=False).max().sum())
+
+
+def _naive_dependencies(df, max_lhs_length, max_error):
+    """ every lhs -> rhs checked on the rows, the ones with a lhs subset which already determines rhs excluded """
+    allowed_error = np.floor(max_error * len(df))
+    columns = df.columns.tolist()
+    dependencies = set()
+    for length in range(0, min(len(columns) - 1, max_lhs_length) + 1):
+        for lhs in combinations(columns, length):
+            for rhs in columns:
+                if rhs in lhs or any(set(subset) <= set(lhs) for subset, other in dependencies if other == rhs):
+                    continue
+                if _g3_error(df, lhs, rhs) <= allowed_error:
+                    dependencies.add((lhs, rhs))
+    return sorted((str(list(lhs)), rhs) for lhs, rhs in dependencies)
+
+
+@pytest.mark.parametrize('max_error', [0.0, 0.1])
+@pytest.mark.parametrize('seed', range(60))
+def test_dependency_search_matches_the_brute_force_search(seed, max_error, random_frame):
+    # nulls are values for the dependencies
+    df = random_frame(seed, max_rows=30, max_cardinality=6, null_rate=0.1)
+    result = H.functional_dependency_profiling(df, 2, max_error)
+    found = sorted(zip(result['lhs'], result['rhs'])) if len(result) else []
+    assert found == _naive_dependencies(df, 2, max_error)
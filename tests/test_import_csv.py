@@ -0,0 +1,47 @@
+import pandas as pd
+
+import Hercules as H
+
+
+def _csv(tmp_path, rows, last_rows):
+    csv = tmp_path / 'data.csv'
+    csv.write_text('code,amount,rate,label\n' + ''.join(f'{row},{row},{row}.5,x{row}\n' for row in range(rows)) + last_rows)
+    return str(csv)
+
+
+def test_leading_zeros_after_the_inferred_rows_are_kept(tmp_path):
+    df = H.import_csv_dataset(_csv(tmp_path, 50, '0012,7,1.5,y\n'), ',', infer_rows=10)
+    assert df['code'].iloc[-1] == '0012'
+    assert df['code'].iloc[0] == '0'
+    assert df['amount'].dtype == 'int64'
+    assert df['rate'].dtype == 'float64'
+
+
+def test_columns_not_fitting_their_inferred_type_fall_back_in_a_single_read(tmp_path, monkeypatch):
+    reads = []
+    read_csv = H.pcsv.read_csv
+    monkeypatch.setattr(H.pcsv, 'read_csv', lambda *args, **kwargs: reads.append(args) or read_csv(*args, **kwargs))
+    df = H.import_csv_dataset(_csv(tmp_path, 50, '7,2.5,n/c,y\n8,,,z\n'), ',', infer_rows=10)
+    assert len(reads) == 1
+    assert df['code'].dtype == 'int64'
+    assert df['amount'].dtype == 'float64' and df['amount'].iloc[-2] == 2.5 and pd.isna(df['amount'].iloc[-1])
+    assert isinstance(df['rate'].dtype, pd.StringDtype) and df['rate'].iloc[-2] == 'n/c' and pd.isna(df['rate'].iloc[-1])
+
+
+def test_leading_zeros_are_kept_without_pyarrow(tmp_path, monkeypatch):
+    monkeypatch.setattr(H, 'pa', None)
+    df = H.import_csv_dataset(_csv(tmp_path, 50, '0012,7,n/c,y\n'), ',', infer_rows=10)
+    assert df['code'].iloc[-1] == '0012'
+    assert pd.api.types.is_integer_dtype(df['amount'])
+    assert df['rate'].iloc[-1] == 'n/c'
+
+
+def test_all_as_string_keeps_the_written_values_and_the_nulls(tmp_path, monkeypatch):
+    csv = tmp_path / 'data.csv'
+    csv.write_text('code,amount\n0012,1.50\n7,NA\n,2\n')
+    df = H.import_csv_dataset(str(csv), ',', all_as_string=True)
+    assert df['code'].tolist()[:2] == ['0012', '7'] and df['amount'].tolist()[0] == '1.50'
+    assert df['code'].isna().tolist() == [False, False, True] and df['amount'].isna().tolist() == [False, True, False]
+    monkeypatch.setattr(H, 'pa', None)
+    df = H.import_csv_dataset(str(csv), ',', all_as_string=True)
+    assert df['code'].isna().tolist() == [False, False, True] and df['amount'].tolist()[0] == '1.50'
@@ -0,0 +1,45 @@
+from itertools import combinations
+
+import numpy as np
+import pytest
+
+import Hercules as H
+
+
+def _naive_keys(df, max_key_len):
+    """ every column combination checked with df.duplicated, keys with a key subset or a nullable column excluded """
+    nullable_columns = set(df.columns[df.isna().any()])
+    keys = []
+    for length in range(1, max_key_len + 1):
+        for candidate in combinations(df.columns, length):
+            if nullable_columns & set(candidate) or any(set(key) <= set(candidate) for key in keys):
+                continue
+            if not df.duplicated(list(candidate)).any():
+                keys.append(candidate)
+    return sorted(str(list(key)) for key in keys)
+
+
+@pytest.mark.parametrize('seed', range(60))
+def test_key_search_matches_the_naive_search(seed, random_frame):
+    # a third of the tables with nullable columns
+    df = random_frame(seed, null_rate=0.05 if seed % 3 == 0 else 0.0)
+    result = H.business_key_profiling(df, 3)
+    found = sorted(result.loc[result['is_key'], 'key']) if len(result) else []
+    assert found == _naive_keys(df, 3)
+
+
+@pytest.mark.parametrize('seed', range(0, 60, 10))
+def test_key_search_on_a_sample_and_with_workers_matches_the_naive_search(seed, random_frame):
+    df = random_frame(seed, null_rate=0.05 if seed % 3 == 0 else 0.0)
+    sampled = H.business_key_profiling(df, 3, sample=df.sample(frac=0.5, random_state=seed))
+    parallel = H.business_key_profiling(df, 3, workers=2)
+    for result in (sampled, parallel):
+        assert (sorted(result.loc[result['is_key'], 'key']) if len(result) else []) == _naive_keys(df, 3)
+
+
+def test_key_codes_share_the_encoding_codes(random_frame):
+    df = random_frame(1)
+    encoding = H.encode_dataset(df)
+    codes = H._key_codes(df, list(df.columns), encoding)
+    for column in df:
+        assert np.shares_memory(codes[column][0], encoding[column]['codes'])
@@ -0,0 +1,31 @@
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+import Hercules as H
+
+
+def test_parquet_statistics_match_the_data(tmp_path):
+    parquet = tmp_path / 'data.parquet'
+    table = pa.table({'id': pa.array(range(6)),
+                      'amount': pa.array([1.5, None, None, None, -2.0, 4.0]),
+                      'label': pa.array(['b', 'a', None, None, 'c', None]),
+                      'empty': pa.array([None] * 6, pa.null())})
+    # row groups of 2 rows : the second one only holds nulls in amount
+    pq.write_table(table, parquet, row_group_size=2)
+    df = table.to_pandas()
+    statistics = H.parquet_statistics(str(parquet)).set_index('name')
+    assert statistics['len'].tolist() == [6] * 4
+    assert statistics['nulls'].tolist() == df.isna().sum().tolist()
+    assert statistics.loc['empty', 'null_%'] == 100.0
+    for column in ['id', 'amount', 'label']:
+        assert (statistics.loc[column, 'min'], statistics.loc[column, 'max']) == (df[column].dropna().min(), df[column].dropna().max())
+    assert np.isnan(statistics.loc['empty', 'min']) and np.isnan(statistics.loc['empty', 'max'])
+
+
+def test_parquet_statistics_of_some_columns(tmp_path):
+    parquet = tmp_path / 'data.parquet'
+    pd.DataFrame({'a': [1, None], 'b': ['x', 'y']}).to_parquet(parquet)
+    statistics = H.parquet_statistics(str(parquet), ['b'])
+    assert statistics[['name', 'nulls', 'min', 'max']].values.tolist() == [['b', 0, 'x', 'y']]
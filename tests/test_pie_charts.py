@@ -0,0 +1,19 @@
+import pandas as pd
+import pytest
+
+import Hercules as H
+
+
+def test_pie_counts_sorted_by_value():
+    df = pd.DataFrame({'o': ['b', 'a', 'b', None, 'c']})
+    values = H.values_profiling(df, H.encode_dataset(df))
+    html = H.pie_charting_ordinal_and_binary_values(df, values, include_plotlyjs=False)
+    assert '"labels":["a","b","c"]' in html
+
+
+@pytest.mark.parametrize('options', [{}, {'sample': 4, 'random_state': 0}, {'workers': 2}])
+def test_profile_dataset_with_mixed_type_values(tmp_path, options):
+    # mixed values can't be sorted : the pie chart keeps them in first appearance order, as groupby does
+    df = pd.DataFrame({'m': [1, 'a', None, 2.5, ' b'], 'k': range(5)})
+    H.profile_dataset(df, str(tmp_path / 'report.html'), **options)
+    assert (tmp_path / 'report.html').stat().st_size > 0
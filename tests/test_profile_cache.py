@@ -0,0 +1,109 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import Hercules as H
+
+
+def _write_csv(path, rows):
+    pd.DataFrame({'id': np.arange(rows), 'code': ['C' + str(i % 7) for i in range(rows)]}).to_csv(path, index=False, sep=';')
+
+
+def _is_key(cache_file, key):
+    result = H.load_profile_cache(str(cache_file))['keys']['result']
+    return bool(result.loc[result['key'] == key, 'is_key'].iloc[0])
+
+
+def _profile(csv, tmp_path, cache_file):
+    H.profile_csv_incremental(str(csv), str(tmp_path / 'report.html'), cache_file=str(cache_file), chunksize=5000, max_key_length=2)
+
+
+def _edit_id(csv, old_id, new_id):
+    # same length values : the file size doesn't change
+    text = csv.read_text()
+    assert len(str(old_id)) == len(str(new_id))
+    csv.write_text(text.replace('\n' + str(old_id) + ';', '\n' + str(new_id) + ';', 1))
+
+
+def test_same_size_edit_in_the_middle_is_not_the_cached_file(tmp_path):
+    csv, cache_file = tmp_path / 'data.csv', tmp_path / 'data.profile_cache'
+    _write_csv(csv, 20000)
+    _profile(csv, tmp_path, cache_file)
+    assert _is_key(cache_file, "['id']")
+
+    size = os.path.getsize(csv)
+    _edit_id(csv, 10000, 10002)
+    assert os.path.getsize(csv) == size
+    _profile(csv, tmp_path, cache_file)
+    assert not _is_key(cache_file, "['id']")
+    assert H.load_profile_cache(str(cache_file))['rows'] == 20000
+
+
+def test_edit_in_the_middle_then_appended_rows_is_not_an_append(tmp_path):
+    csv, cache_file = tmp_path / 'data.csv', tmp_path / 'data.profile_cache'
+    _write_csv(csv, 20000)
+    _profile(csv, tmp_path, cache_file)
+
+    _edit_id(csv, 10000, 10002)
+    with open(csv, 'a') as file:
+        file.write('20000;C1\n20001;C2\n')
+    _profile(csv, tmp_path, cache_file)
+    assert not _is_key(cache_file, "['id']")
+    assert H.load_profile_cache(str(cache_file))['rows'] == 20002
+
+
+def test_appended_rows_keep_the_cache(tmp_path, capsys):
+    csv, cache_file = tmp_path / 'data.csv', tmp_path / 'data.profile_cache'
+    _write_csv(csv, 20000)
+    _profile(csv, tmp_path, cache_file)
+    with open(csv, 'a') as file:
+        file.write('20000;C1\n')
+    fingerprint = H.file_fingerprint(str(csv), H.load_profile_cache(str(cache_file))['fingerprint']['size'])
+    assert H._is_appended(fingerprint, H.load_profile_cache(str(cache_file))['fingerprint'])
+    _profile(csv, tmp_path, cache_file)
+    assert _is_key(cache_file, "['id']")
+    assert H.load_profile_cache(str(cache_file))['rows'] == 20001
+
+
+@pytest.mark.skipif(not hasattr(os, 'getuid'), reason='posix permissions')
+def test_cache_writable_by_others_is_not_loaded(tmp_path):
+    csv, cache_file = tmp_path / 'data.csv', tmp_path / 'data.profile_cache'
+    _write_csv(csv, 100)
+    _profile(csv, tmp_path, cache_file)
+    assert os.stat(cache_file).st_mode & 0o077 == 0
+    assert H.load_profile_cache(str(cache_file)) is not None
+    os.chmod(cache_file, 0o666)
+    assert H.load_profile_cache(str(cache_file)) is None
+
+
+def test_default_cache_file_is_in_a_private_directory(tmp_path, monkeypatch):
+    monkeypatch.setenv('XDG_CACHE_HOME', str(tmp_path / 'cache'))
+    cache_file = H.default_profile_cache_file(str(tmp_path / 'data.csv'))
+    assert os.path.dirname(cache_file) == str(tmp_path / 'cache' / 'hercules')
+    if hasattr(os, 'getuid'):
+        assert os.stat(os.path.dirname(cache_file)).st_mode & 0o077 == 0
+
+
+@pytest.mark.parametrize('content', [b'cmodule_of_another_version\nAccumulator\n.', b'\x80\x04K\x01)R.', b''])
+def test_unusable_cache_falls_back_to_full_profiling(tmp_path, content):
+    csv, cache_file = tmp_path / 'data.csv', tmp_path / 'data.profile_cache'
+    _write_csv(csv, 100)
+    cache_file.write_bytes(content)
+    os.chmod(cache_file, 0o600)
+    assert H.load_profile_cache(str(cache_file)) is None
+    cache_file.unlink()
+    cache_file.write_bytes(content)
+    os.chmod(cache_file, 0o600)
+    _profile(csv, tmp_path, cache_file)
+    assert H.load_profile_cache(str(cache_file))['rows'] == 100
+
+
+def test_keys_are_only_searched_when_asked(tmp_path):
+    csv, cache_file = tmp_path / 'data.csv', tmp_path / 'data.profile_cache'
+    _write_csv(csv, 100)
+    H.profile_csv_incremental(str(csv), str(tmp_path / 'report.html'), cache_file=str(cache_file))
+    cache = H.load_profile_cache(str(cache_file))
+    assert cache['keys'] is None
+    assert set(cache['fingerprint']) == {'size', 'sha256', 'ends_with_newline'}
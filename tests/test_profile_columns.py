@@ -0,0 +1,20 @@
+import Hercules as H
+
+
+def test_workers_send_back_encodings_without_row_codes(mixed_frame):
+    df = mixed_frame
+    serial = H.profile_columns(df)
+    parallel = H.profile_columns(df, workers=2)
+    for serial_profile, parallel_profile in zip(serial, parallel):
+        assert 'codes' not in parallel_profile['encoding']
+        assert list(parallel_profile['encoding']['counts']) == list(serial_profile['encoding']['counts'])
+        for analysis in H.COLUMN_ANALYSES:
+            assert str(parallel_profile[analysis]) == str(serial_profile[analysis])
+
+
+def test_keys_and_dependencies_from_encodings_without_row_codes(mixed_frame):
+    df = mixed_frame
+    serial = {column: profile['encoding'] for column, profile in zip(df.columns, H.profile_columns(df))}
+    parallel = {column: profile['encoding'] for column, profile in zip(df.columns, H.profile_columns(df, workers=2))}
+    assert H.business_key_profiling(df, 2, parallel).equals(H.business_key_profiling(df, 2, serial))
+    assert H.functional_dependency_profiling(df, 2, 0.0, parallel).equals(H.functional_dependency_profiling(df, 2, 0.0, serial))
@@ -0,0 +1,40 @@
+import re
+
+import pandas as pd
+import pytest
+
+import Hercules as H
+
+
+EDGE_VALUES = ['', ' ', '\n', 'True', 'True\n', 'true ', 'False', 'falseee', 'fals', '0', '1', '2', '10', '1\n', 'x1',
+               '12/03/2022', '1/3/22', '12/03/2022\n', '32/13/20222', '1,5', '-3.2', '3 200', 'abc', 'abc\n', 'a\nb',
+               'Été', 'é', 'Ü', 'ÿ', 'À', '×', '÷', '€', '²', '◘', 'œ', '　', '\x85', '\xa0', ' ', '\t', ' lead', 'trail ',
+               '(a-b); "c"?', 'a%b', 'a/b\\c', '[x]', '^', '日本']
+
+PATTERNS = [regex_pattern for _, _, regex_pattern in H.PROFILING_REGEXES] + [r'^\s+']
+
+
+@pytest.mark.parametrize('regex_pattern', PATTERNS)
+def test_re2_translation_matches_python_re(regex_pattern):
+    assert H._re2_pattern(regex_pattern) is not None
+    text = H._regex_text(pd.Series(EDGE_VALUES))
+    expected = [re.match(regex_pattern, value) is not None for value in EDGE_VALUES]
+    assert text.dtype == 'string' and text.dtype.storage == 'pyarrow'
+    # RE2 run by arrow, without the python fallback of _regex_matches
+    assert text.str.contains(H._re2_pattern(regex_pattern), regex=True).tolist() == expected
+    assert H._regex_matches(text, regex_pattern).tolist() == expected
+
+
+def _classify(values):
+    return H.regex_classifier(pd.Series(values), {name: regex_pattern for name, _, regex_pattern in H.PROFILING_REGEXES})
+
+
+@pytest.mark.parametrize('values', [EDGE_VALUES, ['True', 'false', '1'], ['12', '0012', 'True\n'], ['Été', 'abc'], []])
+def test_regex_classifier_without_pyarrow(values, monkeypatch):
+    with_arrow = _classify(values)
+    monkeypatch.setattr(H, 'pa', None)
+    without_arrow = _classify(values)
+    assert without_arrow == with_arrow
+    for name, _, regex_pattern in H.PROFILING_REGEXES:
+        no_match = [value for value in values if re.match(regex_pattern, value) is None]
+        assert without_arrow[name] == ((True, '[Empty col]') if not values else (True, '[No no-match]') if not no_match else (False, no_match[0]))
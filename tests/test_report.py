@@ -0,0 +1,55 @@
+import pandas as pd
+import pytest
+
+import Hercules as H
+
+
+def _failing_section(run):
+    run['report'].write('<p>partial</p>')
+    raise ValueError('section failed')
+
+
+@pytest.fixture
+def failing_section():
+    registry = dict(H.SECTION_REGISTRY)
+    H.register_section('failing', _failing_section)
+    yield 'failing'
+    H.SECTION_REGISTRY.clear()
+    H.SECTION_REGISTRY.update(registry)
+    H.PROFILE_SECTIONS[:] = list(registry)
+
+
+def test_report_is_closed_when_a_section_fails(tmp_path, failing_section, monkeypatch):
+    reports = []
+
+    class RecordedHtmlReport(H.HtmlReport):
+        def __init__(self, *args):
+            super().__init__(*args)
+            reports.append(self)
+
+    monkeypatch.setattr(H, 'HtmlReport', RecordedHtmlReport)
+    with pytest.raises(ValueError):
+        H.profile_dataset(pd.DataFrame({'a': [1, 2, 3]}), str(tmp_path / 'a.html'), sections=['head', failing_section])
+    assert reports and reports[0].html_file.closed
+
+
+def test_failed_profiling_isnt_linked_from_the_summary(tmp_path, failing_section):
+    csv = tmp_path / 'a.csv'
+    csv.write_text('a,b\n1,x\n2,y\n')
+    output_html_file = tmp_path / 'a.html'
+    summary = H._profile_file(str(csv), str(output_html_file), {'separateur': ','},
+                              {'sections': ['head', failing_section]})
+    assert output_html_file.exists()
+    assert summary['report'] is None
+    assert summary['status'].startswith('ValueError')
+
+
+@pytest.mark.parametrize('all_as_string', [True, False])
+def test_describe_sections_without_numeric_or_text_columns(tmp_path, all_as_string):
+    csv = tmp_path / 'numbers.csv'
+    csv.write_text('a,b\n' + ''.join(f'{row},{row % 3}.5\n' for row in range(20)))
+    df = H.import_csv_dataset(str(csv), ',', all_as_string=all_as_string)
+    assert len(df.select_dtypes(include='number').columns) == (0 if all_as_string else 2)
+    output_html_file = tmp_path / 'numbers.html'
+    H.profile_dataset(df, str(output_html_file), sections=['describe'])
+    assert output_html_file.exists()
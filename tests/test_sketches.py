@@ -0,0 +1,114 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import Hercules as H
+
+
+def test_hyperloglog_estimate_and_merge():
+    first, second = H.HyperLogLog(0.01), H.HyperLogLog(0.01)
+    first.add(list(range(0, 60000)))
+    second.add(list(range(40000, 100000)))
+    assert first.estimate() == pytest.approx(60000, rel=0.04)
+    assert first.merge(second).estimate() == pytest.approx(100000, rel=0.04)
+
+
+def test_hyperloglog_int_and_float_values_are_the_same_values():
+    sketch = H.HyperLogLog()
+    sketch.add([1, 2, 3])
+    sketch.add([1.0, 2.0, 3.0])
+    sketch.add([np.int64(2), 'a'])
+    sketch.add(['a', 3.0])
+    assert round(sketch.estimate()) == 4
+
+
+def test_heavy_hitters_bounds_and_merge():
+    rng = np.random.default_rng(0)
+    rows = np.concatenate([rng.integers(0, 5000, 20000), np.repeat([-1, -2, -3], [3000, 2000, 1000])])
+    rng.shuffle(rows)
+    error = 0.01
+    sketches = []
+    for chunk in np.array_split(rows, 4):
+        sketch = H.HeavyHitters(error)
+        sketch.add_counts(pd.Series(chunk).value_counts().to_dict())
+        sketches.append(sketch)
+    merged = sketches[0]
+    for sketch in sketches[1:]:
+        merged.merge(sketch)
+    exact = pd.Series(rows).value_counts()
+    # every value more frequent than error * rows is kept, undercounted by at most error * rows
+    for value, count in exact[exact > error * len(rows)].items():
+        assert count - error * len(rows) <= merged.counters[value] <= count
+    assert merged.top() == (-1, merged.counters[-1])
+    assert len(merged.counters) <= merged.capacity
+
+
+def test_heavy_hitters_counts_are_exact_below_capacity():
+    sketch = H.HeavyHitters(0.01)
+    sketch.add_counts({'a': 5, 'b': 2})
+    sketch.merge(H.HeavyHitters(0.01))
+    sketch.add_counts({'b': 4})
+    assert sketch.counters == {'a': 5, 'b': 6}
+    assert sketch.top() == ('b', 6)
+
+
+def test_tdigest_quantiles_and_merge():
+    rng = np.random.default_rng(0)
+    values = rng.normal(size=100000)
+    digests = []
+    for chunk in np.array_split(values, 5):
+        digest = H.TDigest(200)
+        digest.add(chunk)
+        digests.append(digest)
+    merged = digests[0]
+    for digest in digests[1:]:
+        merged.merge(digest)
+    sorted_values = np.sort(values)
+    for q in (0.01, 0.25, 0.5, 0.75, 0.99):
+        # rank error of the estimate
+        assert abs(np.searchsorted(sorted_values, merged.quantile(q)) / len(values) - q) < 0.005
+    assert merged.quantile(0) == values.min() and merged.quantile(1) == values.max()
+    assert merged.weights.sum() == len(values)
+
+
+def _accumulator(chunks, **options):
+    accumulator = H.ColumnAccumulator('amount', **options)
+    for chunk in chunks:
+        accumulator.update(chunk)
+    return accumulator
+
+
+def _int_then_float_chunks():
+    # an int column whose nulls are all in the last chunk : read as int64 then as float64
+    values = np.arange(3000) % 500
+    last_chunk = pd.Series(values[2000:], dtype='float64')
+    last_chunk.iloc[::7] = np.nan
+    return [pd.Series(values[:1000]), pd.Series(values[1000:2000]), last_chunk]
+
+
+@pytest.mark.parametrize('options', [{}, {'approximate': True}, {'max_distinct': 100}])
+def test_accumulator_of_int_and_float_chunks(options):
+    chunks = _int_then_float_chunks()
+    accumulator = _accumulator(chunks, **options)
+    column = pd.concat(chunks, ignore_index=True)
+    assert accumulator.sketched == bool(options)
+    assert accumulator.distinct_amount() == pytest.approx(column.nunique(), rel=0.02)
+    count, unique, _, _ = accumulator.non_numeric_describe()
+    assert count == column.count() and unique == pytest.approx(500, rel=0.02)
+    assert accumulator.null_analysis()['nulls'] == column.isna().sum()
+    describe = accumulator.numeric_describe()
+    expected = column.describe()
+    for stat in ('count', 'mean', 'std', 'min', 'max'):
+        assert describe[stat] == pytest.approx(expected[stat])
+    assert describe['50%'] == pytest.approx(expected['50%'], abs=10)
+
+
+@pytest.mark.parametrize('options', [{}, {'approximate': True}, {'max_distinct': 100}])
+def test_merged_accumulators_match_a_single_accumulator(options):
+    chunks = _int_then_float_chunks()
+    single = _accumulator(chunks, **options)
+    merged = _accumulator(chunks[:1], **options).merge(_accumulator(chunks[1:], **options))
+    assert merged.rows == single.rows and merged.nulls == single.nulls
+    assert merged.distinct_amount() == pytest.approx(single.distinct_amount(), rel=0.02)
+    assert merged.numeric_describe()[['count', 'mean', 'min', 'max']].equals(single.numeric_describe()[['count', 'mean', 'min', 'max']])
+    assert merged.regex_analysis() == single.regex_analysis()
@@ -0,0 +1,74 @@
+import sqlite3
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import Hercules as H
+
+
+def _frame():
+    rng = np.random.default_rng(0)
+    rows = 200
+    return pd.DataFrame({'id': np.arange(rows), 'group': np.arange(rows) % 7, 'rank': np.arange(rows) // 7,
+                         'amount': np.where(rng.random(rows) < 0.1, np.nan, rng.normal(size=rows).round(3)),
+                         'code': rng.choice(['A', 'B', 'C', 'D'], rows, p=[0.4, 0.3, 0.2, 0.1]),
+                         'label': np.where(rng.random(rows) < 0.2, None, rng.choice(['x', 'y'], rows)),
+                         'duplicated': np.arange(rows) % 150})
+
+
+@pytest.fixture
+def connection():
+    connection = sqlite3.connect(':memory:')
+    _frame().to_sql('data', connection, index=False)
+    yield connection
+    connection.close()
+
+
+def test_sql_nulls(connection):
+    assert H.sql_null_profiling(connection, 'data').equals(H.null_profiling(_frame()))
+
+
+def test_sql_values(connection):
+    sql_result = H.sql_values_profiling(connection, 'data')
+    result = H.values_profiling(_frame())
+    assert sql_result['type'].tolist() == result['type'].tolist()
+    for sql_samples, samples, values_type in zip(sql_result['samples'], result['samples'], result['type']):
+        if values_type != 'continuous':
+            assert sorted(str(None if pd.isna(value) else value) for value in sql_samples) == \
+                sorted(str(None if pd.isna(value) else value) for value in samples)
+
+
+def test_sql_describe(connection):
+    df = _frame()
+    numeric_columns = H.sql_numeric_columns(connection, 'data')
+    assert numeric_columns == df.select_dtypes(include='number').columns.tolist()
+    sql_describe = H.sql_numeric_describe(connection, 'data', numeric_columns)
+    pd.testing.assert_frame_equal(sql_describe, df.describe(include='number'), check_exact=False)
+    non_numeric_columns = [column for column in df if column not in numeric_columns]
+    sql_describe = H.sql_non_numeric_describe(connection, 'data', non_numeric_columns)
+    assert sql_describe.astype(str).equals(H.non_numeric_describe(df).astype(str))
+
+
+def test_sql_keys(connection):
+    sql_result = H.sql_business_key_profiling(connection, 'data', 2)
+    result = H.business_key_profiling(_frame(), 2)
+    assert sql_result[['key', 'is_key']].equals(result[['key', 'is_key']])
+    keys = sql_result.loc[sql_result['is_key'], 'key'].tolist()
+    assert "['id']" in keys and "['group', 'rank']" in keys and "['duplicated']" not in keys
+
+
+def test_sql_text_after_the_first_rows_isnt_numeric(connection):
+    connection.execute("INSERT INTO data (id, amount) VALUES (1000, 'n/a')")
+    assert 'amount' not in H.sql_numeric_columns(connection, 'data', nrows=10)
+    assert 'id' in H.sql_numeric_columns(connection, 'data', nrows=10)
+
+
+def test_profile_sql_table(tmp_path):
+    database = tmp_path / 'data.sqlite'
+    with sqlite3.connect(database) as connection:
+        _frame().to_sql('data', connection, index=False)
+    connection.close()
+    output_html_file = tmp_path / 'data.html'
+    H.profile_sql_table(str(database), 'data', str(output_html_file), max_key_length=2)
+    assert 'Recherche des clefs' in output_html_file.read_text()
@@ -0,0 +1,33 @@
+import pandas as pd
+
+import Hercules as H
+
+
+def _category_csv(tmp_path):
+    csv = tmp_path / 'codes.csv'
+    csv.write_text('id,code\n' + ''.join(f"{row},{' A' if row % 2 else 'B '}\n" for row in range(400)))
+    return str(csv)
+
+
+def test_category_columns_are_trimmed_before_the_regex_checks(tmp_path):
+    df = H.import_csv_dataset(_category_csv(tmp_path), ',')
+    assert isinstance(df['code'].dtype, pd.CategoricalDtype)
+    regex = H.profile_columns(df, analyses=['regex'])[1]['regex']
+    assert regex['one_word_no_accent_regex']
+    assert regex['l_regex_no_match'] == '[No no-match]'
+
+
+def test_trim_strips_and_merges_the_categories():
+    df = pd.DataFrame({'code': pd.Series([' A', 'B ', None, 'A'], dtype='category')})
+    H.trim(df)
+    assert isinstance(df['code'].dtype, pd.CategoricalDtype)
+    assert list(df['code'].cat.categories) == ['A', 'B']
+    assert df['code'].isna().tolist() == [False, False, True, False]
+    assert df['code'].dropna().tolist() == ['A', 'B', 'A']
+
+
+def test_trim_column_encoding_of_a_category_column():
+    encoding = H.encode_column(pd.Series([' A', 'B ', None, 'A', ' A'], dtype='category'))
+    trimmed = H.trim_column_encoding(encoding)
+    assert dict(zip(pd.Series(trimmed['uniques']).astype(object).where(lambda values: values.notna(), None),
+                    trimmed['counts'])) == {'A': 3, 'B': 1, None: 1}